@@ -0,0 +1,95 @@
+import asyncio
+import time
+import numpy as np
+from entropy_methods import (
+    fetch_atmospheric_noise_batch, fetch_quantum_entropy_batch, QuantumEntropyPool,
+    RANDOM_ORG_MAX_BLOCK, ANU_MAX_LENGTH, ANU_MAX_BLOCK_SIZE, ANU_RATE_LIMIT,
+)
+
+# default maximum requests per second for each remote source
+SOURCE_RATE_LIMITS = {
+    "random.org": 5.0,
+    "anu": ANU_RATE_LIMIT,
+}
+# sources whose chunks run one at a time whatever max_concurrency is: every ANU chunk is served from one shared
+# QuantumEntropyPool, so more of them would only queue up on its buffer and its rate limit
+SOURCE_CONCURRENCY = {
+    "anu": 1,
+}
+
+
+class RateLimiter:
+    """
+    Spaces out the requests of one source so that at most rate of them start per second.
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_slot > now:
+                await asyncio.sleep(self._next_slot - now)
+                now = self._next_slot
+            self._next_slot = now + self.interval
+
+
+async def fetch_source_async(fetch_batch, min_vals, max_vals, chunk_size, semaphore, limiter):
+    """
+    Splits the rows into chunks of chunk_size and fetches them in worker threads, never running more chunks
+    at once than the semaphore allows and never starting them faster than the limiter allows.
+    """
+    async def fetch_chunk(start):
+        async with semaphore:
+            await limiter.wait()
+            return await asyncio.to_thread(fetch_batch, min_vals[start:start + chunk_size], max_vals[start:start + chunk_size])
+
+    chunks = await asyncio.gather(*(fetch_chunk(start) for start in range(0, len(min_vals), chunk_size)))
+    return np.concatenate(chunks) if chunks else np.empty(0)
+
+
+async def fetch_sources_async(min_vals, max_vals, sources, max_concurrency=4, rate_limits=None, concurrency=None):
+    """
+    Fetches one value per row from every source at the same time.
+    sources maps a source name to a (fetch_batch, chunk_size) pair, where fetch_batch(min_vals, max_vals) returns
+    one value per row. Each source gets its own concurrency bound and rate limit, so a dual pass takes about as
+    long as the slowest source. concurrency may map source names to a bound other than max_concurrency
+    (SOURCE_CONCURRENCY by default). Returns a dict of source name to values.
+    """
+    rate_limits = SOURCE_RATE_LIMITS if rate_limits is None else rate_limits
+    concurrency = SOURCE_CONCURRENCY if concurrency is None else concurrency
+    min_vals = np.asarray(min_vals, dtype=np.float64)
+    max_vals = np.asarray(max_vals, dtype=np.float64)
+
+    tasks = []
+    for name, (fetch_batch, chunk_size) in sources.items():
+        semaphore = asyncio.Semaphore(concurrency.get(name, max_concurrency))
+        limiter = RateLimiter(rate_limits.get(name))
+        tasks.append(fetch_source_async(fetch_batch, min_vals, max_vals, chunk_size, semaphore, limiter))
+
+    results = await asyncio.gather(*tasks)
+    return dict(zip(sources, results))
+
+
+async def fetch_dual_async(min_vals, max_vals, RANDOM_API_KEY, QUANTUM_API_KEY, max_concurrency=4, rate_limits=None, client=None):
+    """
+    Fetches Atmospheric (random.org) and Quantum (ANU) values for every row concurrently.
+    With an entropy store the chunks of each source are fetched one after another (the two sources still run side
+    by side), so blocks are recorded in the order replay hands them out and a replayed run is identical.
+    The ANU rate limit is applied by the pool to every request it makes, its background refills included.
+    """
+    rate_limits = SOURCE_RATE_LIMITS if rate_limits is None else rate_limits
+    pool = QuantumEntropyPool(QUANTUM_API_KEY, client=client, rate=rate_limits.get("anu", 0))
+    rate_limits = {name: rate for name, rate in rate_limits.items() if name != "anu"}
+    concurrency = None
+    if client is not None and client.store is not None:
+        concurrency = {"random.org": 1, "anu": 1}
+    sources = {
+        "random.org": (lambda lo, hi: fetch_atmospheric_noise_batch(lo, hi, RANDOM_API_KEY, client=client), RANDOM_ORG_MAX_BLOCK),
+        "anu": (lambda lo, hi: fetch_quantum_entropy_batch(lo, hi, QUANTUM_API_KEY, pool=pool), ANU_MAX_LENGTH * ANU_MAX_BLOCK_SIZE),
+    }
+    results = await fetch_sources_async(min_vals, max_vals, sources, max_concurrency, rate_limits, concurrency)
+    return results["random.org"], results["anu"]
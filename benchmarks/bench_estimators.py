@@ -0,0 +1,31 @@
+import pytest
+from sliding_window import deviation_ranges, rolling_mean_std, correlation_profile, correlation_offsets, spectral_entropy_profile
+
+pytest.importorskip("pytest_benchmark")
+
+STANDARD_DEVIATION_RANGE = 10
+
+
+@pytest.mark.parametrize("deviation_method", ["std", "mad", "iqr", "bayesian", "spectral"])
+def bench_deviation_ranges(timed, time_values, deviation_method):
+    lower_ranges, upper_ranges = timed(deviation_ranges, time_values, STANDARD_DEVIATION_RANGE, deviation_method)
+    assert len(lower_ranges) == len(time_values)
+
+
+@pytest.mark.parametrize("rolling", [False, True], ids=["block", "rolling"])
+def bench_correlation_profile(timed, time_values, rolling):
+    def profile_and_offsets():
+        profile = correlation_profile(time_values, STANDARD_DEVIATION_RANGE, rolling=rolling)
+        return correlation_offsets(profile, len(time_values), STANDARD_DEVIATION_RANGE, rolling)
+
+    offsets = timed(profile_and_offsets)
+    assert len(offsets) == len(time_values)
+
+
+def bench_rolling_mean_std(timed, time_values):
+    timed(rolling_mean_std, time_values, STANDARD_DEVIATION_RANGE)
+
+
+def bench_spectral_entropy_profile(timed, time_values):
+    profile = timed(spectral_entropy_profile, time_values, STANDARD_DEVIATION_RANGE)
+    assert len(profile) == len(time_values)
@@ -0,0 +1,15 @@
+import pytest
+from ingest import read_column
+from conftest import BUNDLED_DATASET
+
+pytest.importorskip("pytest_benchmark")
+
+
+def bench_read_bundled_dataset(benchmark):
+    benchmark(read_column, BUNDLED_DATASET, "time")
+
+
+@pytest.mark.parametrize("column_name", ["time", "mag"])
+def bench_read_column(timed, dataset_csv, column_name):
+    values = timed(read_column, dataset_csv, column_name)
+    assert len(values) > 0
@@ -0,0 +1,23 @@
+import pytest
+from entropy_metrics import shannon_entropy_rolling, permutation_entropy_rolling, block_entropies, entropy_metrics
+
+pytest.importorskip("pytest_benchmark")
+
+
+def bench_shannon_entropy(timed, time_values):
+    profile = timed(shannon_entropy_rolling, time_values)
+    assert len(profile) == len(time_values)
+
+
+def bench_permutation_entropy(timed, time_values):
+    profile = timed(permutation_entropy_rolling, time_values)
+    assert len(profile) == len(time_values)
+
+
+def bench_sample_entropy(timed, time_values):
+    timed(block_entropies, time_values)
+
+
+def bench_entropy_metrics(timed, time_values):
+    metrics = timed(entropy_metrics, time_values)
+    assert metrics.rows == len(time_values)
@@ -0,0 +1,31 @@
+import pytest
+from pipeline import generate_values
+from entropy_sources import available_sources
+
+pytest.importorskip("pytest_benchmark")
+
+STANDARD_DEVIATION_RANGE = 10
+
+
+def bench_gaussian(timed, time_values):
+    new_vals, _ = timed(generate_values, time_values, "Gaussian", STANDARD_DEVIATION_RANGE, seed=0)
+    assert len(new_vals) == len(time_values)
+
+
+@pytest.mark.parametrize("method", ["Atmospheric", "Quantum", "Atmospheric Quantum", "random.org", "anu"])
+def bench_remote_source(timed, time_values, remote_client, method):
+    # random.org and ANU are served by the local stub server, see --stub-latency
+    new_vals, _ = timed(
+        generate_values, time_values, method, STANDARD_DEVIATION_RANGE, "std", None,
+        "benchmark", "benchmark", client=remote_client,
+    )
+    assert len(new_vals) == len(time_values)
+    assert remote_client.summary()
+
+
+@pytest.mark.parametrize("method", ["pcg64", "urandom", "hwrng"])
+def bench_local_source(timed, time_values, method):
+    if method not in available_sources("uniform"):
+        pytest.skip("no readable hardware RNG")
+    new_vals, _ = timed(generate_values, time_values, method, STANDARD_DEVIATION_RANGE, "std", None, seed=0)
+    assert len(new_vals) == len(time_values)
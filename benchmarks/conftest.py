@@ -0,0 +1,84 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import entropy_methods  # noqa: E402
+import async_fetch  # noqa: E402
+from entropy_client import EntropyClient  # noqa: E402
+from ingest import read_column  # noqa: E402
+from stub_server import StubEntropyServer  # noqa: E402
+
+BUNDLED_DATASET = os.path.join(REPO_DIR, "2024-02-11__2024-04-08.csv")
+DEFAULT_ROWS = "1000,10000,100000,1000000"
+
+
+def pytest_addoption(parser):
+    parser.addoption("--rows", default=DEFAULT_ROWS, help="comma separated dataset sizes to benchmark (default: %(default)s)")
+    parser.addoption("--stub-latency", type=float, default=0.05, help="seconds the stub entropy server waits before every response (default: %(default)s)")
+
+
+def pytest_configure(config):
+    # keep every run as JSON under .benchmarks/ so it can be compared with --benchmark-compare
+    if hasattr(config.option, "benchmark_autosave") and not (config.option.benchmark_json or config.option.benchmark_save):
+        from pytest_benchmark.utils import get_tag
+        config.option.benchmark_autosave = get_tag()
+
+
+def pytest_generate_tests(metafunc):
+    if "rows" in metafunc.fixturenames:
+        sizes = [int(size) for size in metafunc.config.getoption("rows").split(",")]
+        metafunc.parametrize("rows", sizes, scope="session")
+
+
+@pytest.fixture(scope="session")
+def dataset_csv(rows, tmp_path_factory):
+    """
+    The bundled dataset repeated (or cut) to rows rows, written to a temporary CSV.
+    """
+    bundled = pd.read_csv(BUNDLED_DATASET)
+    dataset = bundled.iloc[np.arange(rows) % len(bundled)]
+    path = tmp_path_factory.mktemp("datasets") / f"dataset_{rows}.csv"
+    dataset.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def time_values(dataset_csv):
+    return read_column(dataset_csv, "time")
+
+
+@pytest.fixture(scope="session")
+def stub_server(request):
+    server = StubEntropyServer(request.config.getoption("stub_latency")).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def remote_client(stub_server, monkeypatch):
+    """
+    Points random.org and ANU at the stub server, lifts the per-source rate limits and returns a fresh client.
+    """
+    monkeypatch.setattr(entropy_methods, "RANDOM_ORG_URL", stub_server.url)
+    monkeypatch.setattr(entropy_methods, "ANU_URL", stub_server.url)
+    monkeypatch.setattr(async_fetch, "SOURCE_RATE_LIMITS", {})
+    monkeypatch.setattr(entropy_methods, "ANU_RATE_LIMIT", 0)
+    client = EntropyClient(fallback=False)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def timed(benchmark, rows):
+    """
+    Times function(*args, **kwargs) with the benchmark fixture, using fewer rounds for the larger datasets.
+    """
+    def run(function, *args, **kwargs):
+        rounds = max(1, min(10, 100_000 // rows))
+        return benchmark.pedantic(function, args=args, kwargs=kwargs, rounds=rounds, iterations=1)
+    return run
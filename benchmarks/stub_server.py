@@ -0,0 +1,77 @@
+import json
+import time
+import threading
+import numpy as np
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers random.org generateIntegers (JSON-RPC POST) and ANU (GET) requests with local random numbers,
+    after sleeping for the server's latency.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        time.sleep(self.server.latency)
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        params = request["params"]
+        data = self.server.rng().integers(params["min"], params["max"] + 1, params["n"])
+        self._send_json({"jsonrpc": "2.0", "result": {"random": {"data": data.tolist()}}, "id": request["id"]})
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        query = parse_qs(urlparse(self.path).query)
+        length = int(query["length"][0])
+        data_type = query["type"][0]
+        size = int(query["size"][0])
+
+        if data_type.startswith("hex"):
+            sample_bytes = 2 if data_type == "hex16" else 1
+            raw = self.server.rng().bytes(length * size * sample_bytes).hex()
+            element = size * sample_bytes * 2
+            data = [raw[i:i + element] for i in range(0, len(raw), element)]
+        else:
+            data = self.server.rng().integers(0, 2 ** (16 if data_type == "uint16" else 8), length).tolist()
+        self._send_json({"success": True, "type": data_type, "length": length, "data": data})
+
+
+class StubEntropyServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the random.org and ANU APIs with a configurable latency per request (seconds).
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0.0):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.latency = latency
+        self._seed = 0
+        self._seed_lock = threading.Lock()
+
+    def rng(self):
+        with self._seed_lock:
+            self._seed += 1
+            return np.random.default_rng(self._seed)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
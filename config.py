@@ -0,0 +1,17 @@
+import os
+
+
+def read_config(value, filename="config.txt"):
+    """
+    Reads the config.txt file for the API keys required to operate the endpoints.
+    """
+    if os.path.exists(filename) == False:
+        print("[ X ] Could not find " + filename + ". Are you sure that you created the config.txt file and populated it?")
+        return None
+
+    with open(filename, "r") as file:
+        for line in file:
+            if line.startswith(value):
+                return line.strip().split("=", 1)[1]
+    print("[ X ] Could not find a valid value in configuration file. Are you sure that you created the config.txt file and populated it?")
+    return None 
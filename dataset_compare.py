@@ -1,112 +1,168 @@
-import pandas as pd
+import os
 import numpy as np
-import matplotlib.pyplot as plt
-from datetime import datetime
+import pandas as pd
+from dataclasses import dataclass
+from scipy.stats import ks_2samp
+from ingest import read_column
+from entropy_methods import float_array
+from reporting import normalize, plot_comparison
+from output_writer import read_results, METADATA_FILE, PARQUET_FILE, WIDE_CSV_FILE
 
 
-NEW_DATASET = "output/comparisons.csv" # replace with the actual path to your new dataset
+NEW_DATASET = None # path to a generated dataset to compare instead of random_values.csv in the output folder
 ORIGINAL_DATASET = "2024-02-11__2024-04-08.csv" # replace with the actual path to your original dataset
 
 
-def compare_datasets(NEW_DATASET_COLUMN_NAME="0", ORIGINAL_DATASET_COLUMN_NAME="time"):
+@dataclass
+class ComparisonResult:
     """
-        Compares two datasets and presents the differences.
+    Summary statistics of an original and a new dataset of the same length.
     """
+    rows: int
+    mean_difference: float  # mean of original - new
+    rmse: float
+    normalized_rmse: float  # rmse after scaling both datasets to the range 0 to 1
+    correlation: float  # pearson correlation, nan when either dataset is constant
+    ks_distance: float  # two-sample Kolmogorov-Smirnov statistic of the value distributions
+    ks_pvalue: float
 
-    # load the datasets
-    original_dataset = pd.read_csv(ORIGINAL_DATASET)
-    new_dataset = pd.read_csv(NEW_DATASET)
-
-    # extract the relevant columns
-    original_column = original_dataset[ORIGINAL_DATASET_COLUMN_NAME]
-    new_column = new_dataset[NEW_DATASET_COLUMN_NAME]
-
-    formatted_original_col = []
-
-    # convert the columns to datetime format
-    for row in original_column:
-        if ORIGINAL_DATASET_COLUMN_NAME == "time":
-            datetime_obj = datetime.strptime(row, "%Y-%m-%dT%H:%M:%S.%fZ")
-            timestamp = int(datetime_obj.timestamp())
-            formatted_original_col.append(timestamp)
-        else:
-            formatted_original_col.append(row)
-
-    # remove any extra values from the original column to match the length of the new column and to align the data
-    formatted_original_col = formatted_original_col[:len(new_column)]
-
-    print(formatted_original_col)
-
-    # format the new column to match the original column
-    formatted_new_col = []
-    for row in new_column:
-        if NEW_DATASET_COLUMN_NAME == "time":
-            datetime_obj = datetime.strptime(row, "%Y-%m-%dT%H:%M:%S.%fZ")
-            timestamp = int(datetime_obj.timestamp())
-            formatted_new_col.append(timestamp)
-        else:
-            formatted_new_col.append(row)
-
-    print(formatted_new_col)
-
-    # normalize the datasets
-    original_min, original_max = min(formatted_original_col), max(formatted_original_col)
-    new_min, new_max = min(formatted_new_col), max(formatted_new_col)
-
-    normalized_original_col = [(x - original_min) / (original_max - original_min) for x in formatted_original_col]
-    normalized_new_col = [(x - new_min) / (new_max - new_min) for x in formatted_new_col]
-
-    # plot normalized datasets
-    plt.figure(figsize=(10, 5))
-    plt.plot(normalized_original_col, label='Original Dataset', color='blue')
-    plt.plot(normalized_new_col, label='New Dataset', color='red')
-    plt.title('Comparison of Datasets (NORMALIZED)')
-    plt.xlabel('Index')
-    plt.ylabel('Values')
-    plt.legend()
-    plt.grid()
-    plt.savefig('output/NORMALIZED_FINAL_dataset_comparison.png')
-    plt.show()
-
-    # plot non-normalized datasets
-    plt.figure(figsize=(10, 5))
-    plt.plot(formatted_original_col, label='Original Dataset', color='blue')
-    plt.plot(formatted_new_col, label='New Dataset', color='red')
-    plt.title('Comparison of Datasets')
-    plt.xlabel('Index')
-    plt.ylabel('Values')
-    plt.legend()
-    plt.grid()
-    plt.savefig('output/FINAL_dataset_comparison.png')
-    plt.show()
-
-    # scatter plot of NORMALIZED original vs new values
-    plt.figure(figsize=(10, 5))
-    plt.scatter(normalized_original_col, normalized_new_col, color='orange', label='Data Points')
-    plt.plot([min(normalized_original_col), max(normalized_original_col)],
-            [min(normalized_original_col), max(normalized_original_col)],
-            color='blue', linestyle='--', label='Perfect Match (y=x)')
-    plt.title('Scatter Plot of Original vs New Dataset')
-    plt.xlabel('Original Dataset (NORMALIZED)')
-    plt.ylabel('New Dataset')
-    plt.legend()
-    plt.grid()
-    plt.savefig('output/NORMALIZED_dataset_diff_scatter.png')
-    plt.show()
-
-    # scatter plot of original vs new values
-    plt.figure(figsize=(10, 5))
-    plt.scatter(formatted_original_col, formatted_new_col, color='orange', label='Data Points')
-    plt.plot([min(formatted_original_col), max(formatted_original_col)],
-            [min(formatted_original_col), max(formatted_original_col)],
-            color='blue', linestyle='--', label='Perfect Match (y=x)')
-    plt.title('Scatter Plot of Original vs New Dataset')
-    plt.xlabel('Original Dataset')
-    plt.ylabel('New Dataset')
-    plt.legend()
-    plt.grid()
-    plt.savefig('output/dataset_diff_scatter.png')
-    plt.show()
+    def __str__(self):
+        return (f"rows={self.rows} mean difference={self.mean_difference:.6g} rmse={self.rmse:.6g} "
+                f"normalized rmse={self.normalized_rmse:.6g} correlation={self.correlation:.6g} "
+                f"KS distance={self.ks_distance:.6g} (p={self.ks_pvalue:.3g})")
+
+
+def comparison_stats(original, new):
+    """
+    Computes the ComparisonResult of two equally long arrays.
+    Any float or integer dtype is accepted without a copy, the statistics using two float64 work arrays in total.
+    """
+    original = float_array(original)
+    new = float_array(new)
+    n = len(original)
+    if n == 0:
+        return ComparisonResult(0, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan)
+
+    difference = np.subtract(original, new, dtype=np.float64)
+    mean_difference = float(np.mean(difference))
+    rmse = float(np.sqrt(np.dot(difference, difference) / n))
+
+    # the difference is no longer needed, its array holds the normalized new values and is subtracted in place
+    normalized_difference = normalize(original, out=np.empty(n))
+    normalized_difference -= normalize(new, out=difference)
+
+    correlation = np.nan
+    if n > 1 and np.std(original) > 0 and np.std(new) > 0:
+        correlation = float(np.corrcoef(original, new)[0, 1])
+
+    ks = ks_2samp(original, new)
+    return ComparisonResult(
+        rows=n,
+        mean_difference=mean_difference,
+        rmse=rmse,
+        normalized_rmse=float(np.sqrt(np.dot(normalized_difference, normalized_difference) / n)),
+        correlation=correlation,
+        ks_distance=float(ks.statistic),
+        ks_pvalue=float(ks.pvalue),
+    )
+
+
+def _latest_csv(output_dir):
+    # random_values.csv of a single-column run or wide_results.csv of a multi-column run, whichever was written last
+    paths = [os.path.join(output_dir, name) for name in ("random_values.csv", WIDE_CSV_FILE)]
+    paths = [path for path in paths if os.path.exists(path)]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def _current_results(output_dir):
+    """
+    Returns the binary results of output_dir as read_results does, or None when there are none or a later CSV-only
+    run has written its CSV files since they were saved (their metadata.json or results.parquet is older).
+    """
+    stored = read_results(output_dir)
+    if stored is None:
+        return None
+
+    csv_path = _latest_csv(output_dir)
+    binary_path = os.path.join(output_dir, METADATA_FILE)
+    if os.path.exists(binary_path) == False:
+        binary_path = os.path.join(output_dir, PARQUET_FILE)
+    if csv_path is not None and os.path.getmtime(csv_path) > os.path.getmtime(binary_path):
+        print("[ X ] The binary results in " + output_dir + " are older than " + os.path.basename(csv_path) + ", reading the CSV files instead.")
+        return None
+    return stored
+
+
+def _wide_pairs(columns, column_names):
+    # (column name, original, generated) of every column of a multi-column run, from 2-D arrays or a wide table
+    if "original" in columns:
+        return [(name, columns["original"][:, index], columns["generated"][:, index]) for index, name in enumerate(column_names)]
+    return [(name, columns[name], columns[name + "_generated"]) for name in column_names]
 
-    print("[ ! ] Done comparing datasets.")
 
+def _read_wide_csv(path):
+    header = list(pd.read_csv(path, nrows=0).columns)
+    column_names = [name for name in header if name + "_generated" in header]
+    table = pd.read_csv(path, usecols=column_names + [name + "_generated" for name in column_names])
+    return {name: table[name].to_numpy() for name in table.columns}, column_names
+
+
+def compare_columns(pairs):
+    """
+    Compares every (column name, original, new) of a multi-column run, without charts, the way main.report does.
+    Returns a dict of column name to ComparisonResult.
+    """
+    comparisons = {}
+    for column_name, original, new in pairs:
+        print("[ ! ] " + column_name + ":")
+        comparisons[column_name] = compare_datasets(original=original, new=new, plots=False)
+    return comparisons
+
+
+def compare_datasets(NEW_DATASET_COLUMN_NAME="0", ORIGINAL_DATASET_COLUMN_NAME="time", plots=True, original=None, new=None, output_dir="output", original_offset=0):
+    """
+        Compares the original values of a dataset with the values generated for them, saving the comparison charts
+        unless plots is False. original and new may be passed in as arrays straight from the generation step.
+        When both are left as None the last run saved in output_dir is compared: the original and generated columns
+        of its binary (.npy or Parquet) results, read zero-copy, or else the generated values in
+        output_dir/random_values.csv (NEW_DATASET when set) against the ORIGINAL_DATASET rows from original_offset
+        on. The CSV files do not record which rows the run started from, so original_offset must be the rows it
+        dropped (standard_deviation_range for a regular run, 0 for --stream and --incremental runs).
+        The saved results of a multi-column run (2-D .npy arrays, a wide Parquet file or wide_results.csv) hold the
+        original values of every column and are compared column by column with compare_columns.
+        Returns a ComparisonResult, or a dict of column name to ComparisonResult for a multi-column run.
+    """
+
+    if original is None and new is None:
+        stored = _current_results(output_dir)
+        if stored is not None:
+            columns, metadata = stored
+            if metadata.get("column_names"):
+                return compare_columns(_wide_pairs(columns, metadata["column_names"]))
+            original, new = columns["original"], columns["generated"]
+        elif NEW_DATASET is None and _latest_csv(output_dir) == os.path.join(output_dir, WIDE_CSV_FILE):
+            columns, column_names = _read_wide_csv(_latest_csv(output_dir))
+            return compare_columns(_wide_pairs(columns, column_names))
+
+    # load the datasets, reading only the rows that can be aligned
+    if new is None:
+        new = read_column(NEW_DATASET or os.path.join(output_dir, "random_values.csv"), NEW_DATASET_COLUMN_NAME)
+    new = float_array(new)
+
+    if original is None:
+        original = read_column(ORIGINAL_DATASET, ORIGINAL_DATASET_COLUMN_NAME, original_offset + len(new))[original_offset:]
+    original = float_array(original)
+
+    # remove any extra values to match the length of the shorter dataset and to align the data
+    n = min(len(original), len(new))
+    original = original[:n]
+    new = new[:n]
+
+    result = comparison_stats(original, new)
+    print("[ ! ] " + str(result))
+
+    if plots:
+        plot_comparison(original, new, output_dir)
+
+    print("[ ! ] Done comparing datasets.")
+    return result
@@ -0,0 +1,117 @@
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from instrumentation import stage
+
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # seconds, doubled on every retry
+
+
+class EntropyClient:
+    """
+    Shared HTTP client for the remote entropy sources (random.org and ANU).
+    Holds a single keep-alive requests.Session with a pooled adapter and retry/backoff, and keeps per-source counters
+    for requests, failures, fallbacks taken, bytes received and latency. With fallback disabled the fetch functions raise once the
+    retries are exhausted instead of substituting local uniform noise.
+    An optional EntropyStore records every block fetched, or serves recorded blocks in place of the network.
+    """
+
+    def __init__(self, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, timeout=10, pool_size=10, fallback=True, store=None):
+        self.timeout = timeout
+        self.fallback = fallback
+        self.store = store
+        self.session = requests.Session()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def _source_stats(self, source):
+        return self.stats.setdefault(source, {"requests": 0, "failures": 0, "fallbacks": 0, "bytes": 0, "latency": 0.0})
+
+    def replaying(self):
+        return self.store is not None and self.store.mode == "replay"
+
+    def request(self, source, method, url, **kwargs):
+        """
+        Sends a request through the pooled session and records its latency and size against source.
+        """
+        start = time.perf_counter()
+        try:
+            with stage("http " + source):
+                response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            response.raise_for_status()
+        except requests.RequestException:
+            self.record(source, time.perf_counter() - start, failed=True)
+            raise
+        self.record(source, time.perf_counter() - start, num_bytes=len(response.content))
+        return response
+
+    def record(self, source, latency=0.0, failed=False, num_bytes=0):
+        with self._lock:
+            stats = self._source_stats(source)
+            stats["requests"] += 1
+            stats["latency"] += latency
+            stats["bytes"] += num_bytes
+            if failed:
+                stats["failures"] += 1
+
+    def record_failure(self, source):
+        """
+        Counts a failure that was only detected after the response arrived (e.g. an API error payload).
+        """
+        with self._lock:
+            self._source_stats(source)["failures"] += 1
+
+    def record_fallback(self, source, num_values):
+        with self._lock:
+            self._source_stats(source)["fallbacks"] += num_values
+
+    def summary(self):
+        """
+        Returns the per-source counters, including the mean latency in seconds.
+        """
+        with self._lock:
+            return {
+                source: dict(stats, mean_latency=stats["latency"] / stats["requests"] if stats["requests"] else 0.0)
+                for source, stats in self.stats.items()
+            }
+
+    def print_summary(self):
+        for source, stats in self.summary().items():
+            print(f"[ ! ] {source}: {stats['requests']} requests, {stats['failures']} failures, "
+                  f"{stats['fallbacks']} fallback values, {stats['bytes']} bytes, mean latency {stats['mean_latency'] * 1000:.1f} ms")
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_default_client():
+    """
+    Returns the process-wide EntropyClient, creating it on first use.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = EntropyClient()
+        return _default_client
+
+def set_default_client(client):
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
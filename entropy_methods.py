@@ -1,8 +1,39 @@
 import numpy as np
 import requests
-from scipy.stats import invgamma
+import threading
+import time
+from entropy_client import get_default_client
+from instrumentation import timed
+import functools
 import pandas as pd
-from scipy.signal import welch
+import scipy.fft
+from scipy.signal import get_window
+from numpy.lib.stride_tricks import sliding_window_view
+
+def _invgamma_mean(shape, scale):
+    # closed form mean of invgamma(shape, scale), undefined (inf) for shape <= 1
+    if shape <= 1:
+        return np.full(np.shape(scale), np.inf)[()]
+    return scale / (shape - 1)
+
+def float_array(data):
+    """
+    Returns data as a float array, float32 and float64 arrays as they are (without a copy) and anything else
+    (integers, lists) as float64, so float32 runs stay float32 through every kernel.
+    """
+    data = np.asarray(data)
+    if data.dtype == np.float32 or data.dtype == np.float64:
+        return data
+    return data.astype(np.float64)
+
+def _as_windows(data, window=None):
+    """
+    Returns the windows to reduce along the last axis, either as given or as a strided view of length window.
+    """
+    data = float_array(data)
+    if window is not None:
+        return sliding_window_view(data, window, axis=-1)
+    return np.atleast_2d(data)
 
 def bayesian_std(data, prior=1):
     n = len(data)
@@ -10,8 +41,7 @@ def bayesian_std(data, prior=1):
         return 0 
     
     sample_var = np.var(data, ddof=1)
-    posterior = invgamma(n / 2, scale=n * sample_var / 2 + prior)
-    return np.sqrt(posterior.mean()) 
+    return np.sqrt(_invgamma_mean(n / 2, n * sample_var / 2 + prior))
 
 def mad_based_std(data):
     med = np.median(data)
@@ -36,10 +66,149 @@ def spectral_entropy_std(data):
     """
     Spectral Entropy-Based Standard Deviation
     """
-    freqs, psd = welch(data, nperseg=len(data)//2)  # Power spectral density
-    psd_norm = psd / np.sum(psd)  # Normalize
-    entropy = -np.sum(psd_norm * np.log2(psd_norm + 1e-10))  # Shannon entropy
-    return np.sqrt(entropy) 
+    if len(data) < 2:
+        return 0
+    return float(spectral_entropy_std_batch(data)[0])
+
+def std_batch(data, window=None):
+    """
+    Sample standard deviation of every window.
+    """
+    return np.std(_as_windows(data, window), axis=-1, ddof=1)
+
+def bayesian_std_batch(data, window=None, prior=1):
+    """
+    Bayesian standard deviation of every window.
+    """
+    windows = _as_windows(data, window)
+    n = windows.shape[-1]
+    if n < 2:
+        return np.zeros(windows.shape[:-1])
+
+    sample_var = np.var(windows, axis=-1, ddof=1)
+    return np.sqrt(_invgamma_mean(n / 2, n * sample_var / 2 + prior))
+
+def mad_based_std_batch(data, window=None):
+    """
+    Median Absolute Deviation (MAD) of every window.
+    """
+    windows = _as_windows(data, window)
+    med = np.median(windows, axis=-1, keepdims=True)
+    return np.median(np.abs(windows - med), axis=-1) * 1.4826
+
+def iqr_based_std_batch(data, window=None):
+    """
+    Interquartile Range (IQR) Deviation of every window.
+    """
+    q75, q25 = np.percentile(_as_windows(data, window), [75, 25], axis=-1)
+    return (q75 - q25) / 1.349
+
+def ewmsd_batch(data, window=None, alpha=0.3):
+    """
+    Exponentially Weighted Moving Standard Deviation (EWMSD) at the end of every window.
+    Matches pandas ewm(alpha=alpha).std() with its default adjust=True, bias=False.
+    """
+    windows = _as_windows(data, window)
+    n = windows.shape[-1]
+    weights = (1 - alpha) ** np.arange(n - 1, -1, -1)  # oldest value has the smallest weight
+    sum_w = weights.sum()
+    sum_w2 = np.sum(weights ** 2)
+
+    mean = windows @ weights / sum_w
+    biased_var = (windows - mean[..., None]) ** 2 @ weights / sum_w
+    denominator = sum_w ** 2 - sum_w2
+    if denominator <= 0:
+        return np.full(mean.shape, np.nan)
+    return np.sqrt(biased_var * sum_w ** 2 / denominator)
+
+SPECTRAL_BLOCK_ROWS = 65_536  # windows per FFT pass, bounds the memory of the segment spectra
+
+
+@functools.lru_cache(maxsize=None)
+def _welch_taper(nperseg):
+    """
+    Hann taper and one-sided density scaling of a Welch segment of nperseg values, built once per length.
+    """
+    taper = get_window("hann", nperseg)
+    scale = np.full(nperseg // 2 + 1, 2.0 / np.sum(taper ** 2))
+    scale[0] /= 2  # the DC bin (and the Nyquist bin of even lengths) has no mirrored negative frequency
+    if nperseg % 2 == 0:
+        scale[-1] /= 2
+    taper.flags.writeable = False
+    scale.flags.writeable = False
+    return taper, scale
+
+def segment_periodograms(data, nperseg, axis=-1):
+    """
+    Welch periodogram (Hann taper, mean removed, one-sided density) of every run of nperseg values along axis,
+    one per start, with the frequencies along the last axis. All segments go through one batched rFFT, and
+    scipy.fft keeps the plan of each length cached between calls.
+    """
+    taper, scale = _welch_taper(nperseg)
+    segments = sliding_window_view(float_array(data), nperseg, axis=axis)
+    spectrum = scipy.fft.rfft((segments - segments.mean(axis=-1, keepdims=True)) * taper, axis=-1)
+    return (spectrum.real ** 2 + spectrum.imag ** 2) * scale
+
+def _welch_segments(window):
+    # scipy.signal.welch defaults for nperseg = window // 2: half overlapping segments, the last partial one dropped
+    nperseg = window // 2
+    step = nperseg - nperseg // 2
+    return nperseg, step, (window - nperseg) // step + 1
+
+def _spectral_entropy(psd):
+    # Shannon entropy (bits) of the normalized spectrum, 0 for windows without any power
+    total = np.sum(psd, axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        psd_norm = psd / total  # Normalize
+    entropy = -np.sum(psd_norm * np.log2(psd_norm + 1e-10), axis=-1)
+    return np.where(total[..., 0] > 0, entropy, 0.0)
+
+def spectral_entropy_rolling(data, window):
+    """
+    Spectral entropy of every run of window values down the first axis of data, the same as a Welch PSD with
+    nperseg = window // 2 per window. Overlapping windows share their segments, so every segment is transformed
+    once and each window's PSD is the mean of num_segments strided periodograms.
+    """
+    values = float_array(data)
+    num_windows = len(values) - window + 1
+    nperseg, step, num_segments = _welch_segments(window)
+    entropy = np.zeros((max(num_windows, 0),) + values.shape[1:], dtype=values.dtype)
+    if num_windows < 1 or nperseg < 1:
+        return entropy
+
+    for start in range(0, num_windows, SPECTRAL_BLOCK_ROWS):
+        block = min(SPECTRAL_BLOCK_ROWS, num_windows - start)
+        periodograms = segment_periodograms(values[start:start + block + window - 1], nperseg, axis=0)
+        psd = periodograms[:block].copy()
+        for segment in range(1, num_segments):
+            psd += periodograms[segment * step : segment * step + block]
+        entropy[start:start + block] = _spectral_entropy(psd / num_segments)
+    return entropy
+
+def spectral_entropy_std_rolling(data, window):
+    """
+    Spectral Entropy-Based Standard Deviation of every run of window values down the first axis of data.
+    """
+    return np.sqrt(spectral_entropy_rolling(data, window))
+
+def spectral_entropy_std_batch(data, window=None):
+    """
+    Spectral Entropy-Based Standard Deviation of every window.
+    """
+    if window is not None:
+        return np.moveaxis(spectral_entropy_std_rolling(np.moveaxis(float_array(data), -1, 0), window), 0, -1)
+
+    windows = _as_windows(data)
+    nperseg, step, num_segments = _welch_segments(windows.shape[-1])
+    if nperseg < 1:
+        return np.zeros(windows.shape[:-1])
+    periodograms = segment_periodograms(windows, nperseg)[..., : (num_segments - 1) * step + 1 : step, :]
+    return np.sqrt(_spectral_entropy(periodograms.mean(axis=-2)))  # Power spectral density per window
+
+
+RANDOM_ORG_URL = "https://api.random.org/json-rpc/4/invoke"
+RANDOM_ORG_MAX_INT = 1_000_000_000  # Random.org limit
+RANDOM_ORG_MAX_BLOCK = 10_000  # generateIntegers returns at most 10,000 integers per request
 
 def format_float_for_api(min_val, max_val):
     # ensure we don't have identical min and max
@@ -51,8 +220,7 @@ def format_float_for_api(min_val, max_val):
     range_val = max_val - min_val
 
     # scale factor: Fit the max value within the allowed range
-    max_random_org = 1_000_000_000  # Random.org limit
-    factor = max_random_org / range_val  # Compute scaling factor
+    factor = RANDOM_ORG_MAX_INT / range_val  # Compute scaling factor
 
     # scale min and max to integer values
     min_int = int((min_val - offset) * factor)
@@ -63,6 +231,32 @@ def format_float_for_api(min_val, max_val):
 def randomorg_to_float(random_value, factor, offset):
     return (random_value / factor) + offset 
 
+def format_float_for_api_batch(min_vals, max_vals):
+    """
+    Array version of format_float_for_api. Rows that format_float_for_api would reject (identical or non-finite
+    min and max) are flagged in the returned valid mask instead of raising.
+    """
+    min_vals = np.asarray(min_vals, dtype=np.float64)
+    max_vals = np.asarray(max_vals, dtype=np.float64)
+    valid = (min_vals != max_vals) & np.isfinite(min_vals) & np.isfinite(max_vals)
+
+    offset = np.where(valid, min_vals, 0.0)
+    factor = np.subtract(max_vals, min_vals)
+    factor[~valid] = 1.0
+    np.divide(RANDOM_ORG_MAX_INT, factor, out=factor)
+
+    # both ends are scaled in one work array
+    scaled = np.subtract(min_vals, offset)
+    scaled[~valid] = 0.0
+    scaled *= factor
+    min_int = np.trunc(scaled, out=scaled).astype(np.int64)
+    np.subtract(max_vals, offset, out=scaled)
+    scaled[~valid] = 0.0
+    scaled *= factor
+    max_int = np.trunc(scaled, out=scaled).astype(np.int64)
+
+    return min_int, max_int, factor, offset, valid
+
 def fetch_gaussian_noise(num_values, mean, stddev):
     try:
         # generate Gaussian noise
@@ -72,11 +266,55 @@ def fetch_gaussian_noise(num_values, mean, stddev):
         return np.random.normal(0, 1, num_values)  # fallback to standard normal distribution if error occurs
     
 
-def fetch_atmospheric_noise(num_values, min_val, max_val, RANDOM_API_KEY):
+@timed("fetch gaussian")
+def fetch_gaussian_noise_batch(mean, stddev, rng=None):
+    """
+    Draws one Gaussian sample per row from arrays of means and standard deviations in a single call.
+    rng may be a seed or an np.random.Generator, so runs can be reproduced.
+    """
+    rng = np.random.default_rng(rng)
+    return rng.normal(mean, stddev)
+
+def _request_random_org_integers(num_values, min_val, max_val, RANDOM_API_KEY, client=None):
+    """
+    Requests num_values uniform integers in [min_val, max_val] from random.org's generateIntegers.
+    """
+    headers = {'Content-Type': 'application/json'}
+    payload = {
+        "jsonrpc": "2.0",
+        "method": "generateIntegers",
+        "params": {
+            "apiKey": RANDOM_API_KEY,
+            "n": num_values,
+            "min": min_val,
+            "max": max_val,
+            "replacement": True
+        },
+        "id": 42
+    }
+    client = client or get_default_client()
+    key = f"generateIntegers:{min_val}:{max_val}"
+    if client.replaying():
+        return client.store.replay("random.org", key, num_values).astype(np.int64)
+
+    response = client.request("random.org", "POST", RANDOM_ORG_URL, json=payload, headers=headers)
+    data = response.json()
+    # check for errors
+    if "error" in data:
+        client.record_failure("random.org")
+        raise ValueError(f"Random.org API error: {data['error']['message']}")
+
+    values = np.array(data['result']['random']['data'])
+    if client.store is not None:
+        client.store.record("random.org", key, values.astype("<i4"))
+    return values
+
+def fetch_atmospheric_noise(num_values, min_val, max_val, RANDOM_API_KEY, client=None):
     """
     Fetches random generated numbers from random.org.
-    Falls back to uniform distribution if the request fails.
+    Falls back to uniform distribution if the request fails, unless the client has fallback disabled.
     """
+    client = client or get_default_client()
     # ensure min_val and max_val are numbers
     try:
         min_val, max_val, factor, offset = format_float_for_api(min_val, max_val)
@@ -93,42 +331,112 @@ def fetch_atmospheric_noise(num_values, min_val, max_val, RANDOM_API_KEY):
 
     #print(f"Using Random.org with min={min_val} and max={max_val}")
 
-    url = "https://api.random.org/json-rpc/4/invoke"
-    headers = {'Content-Type': 'application/json'}
-    payload = {
-        "jsonrpc": "2.0",
-        "method": "generateIntegers",
-        "params": {
-            "apiKey": RANDOM_API_KEY,
-            "n": num_values,
-            "min": min_val_n,
-            "max": max_val_n,
-            "replacement": True
-        },
-        "id": 42
-    }
     # try to make the request
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        # check for errors
-        if "error" in data:
-            raise ValueError(f"Random.org API error: {data['error']['message']}")
-        
-        return np.array(data['result']['random']['data'])
+        return _request_random_org_integers(num_values, min_val_n, max_val_n, RANDOM_API_KEY, client)
 
     except (requests.RequestException, ValueError) as e:
+        if not client.fallback:
+            raise
+        client.record_fallback("random.org", num_values)
         print(f"Error fetching atmospheric noise: {e}. Using fallback Gaussian noise. Min: " + str(min_val_n) + ", Max: " + str(max_val_n))
         # fallback: generate noise locally as uniform
         return np.random.uniform(min_val, max_val, size=num_values)
     
 
-def fetch_quantum_entropy(num_values, min_val, max_val, API_KEY):
+@timed("fetch random.org")
+def fetch_atmospheric_noise_batch(min_vals, max_vals, RANDOM_API_KEY, block_size=RANDOM_ORG_MAX_BLOCK, as_float=False, client=None):
+    """
+    Fetches one random.org value for every [min_val, max_val] row using as few generateIntegers calls as possible.
+    Raw uniform integers over the full API range are requested in blocks of block_size and mapped locally onto each
+    row's integer range from format_float_for_api, giving the same distribution as one fetch_atmospheric_noise call
+    per row. With as_float the values are converted back into each row's original range using randomorg_to_float.
+    Falls back to uniform distribution for the rows of any block whose request fails, unless the client has
+    fallback disabled.
+    """
+    client = client or get_default_client()
+    min_int, max_int, factor, offset, valid = format_float_for_api_batch(min_vals, max_vals)
+    num_values = len(min_int)
+    noise = np.empty(num_values, dtype=np.float64)
+
+    # rows with identical min and max cannot be sent to the API
+    if not valid.all():
+        print(f"[ X ] Invalid range for {np.count_nonzero(~valid)} rows. Min and max values must be different and finite.")
+        noise[~valid] = np.random.uniform(0, 1, size=np.count_nonzero(~valid))
+
+    rows = np.flatnonzero(valid)
+    low = np.minimum(min_int, max_int)
+    high = np.maximum(min_int, max_int)
+
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        try:
+            raw = _request_random_org_integers(len(block), 0, RANDOM_ORG_MAX_INT, RANDOM_API_KEY, client).astype(np.int64)
+            # scale each raw integer onto the row's own integer range
+            noise[block] = low[block] + (raw * (high[block] - low[block] + 1)) // (RANDOM_ORG_MAX_INT + 1)
+        except (requests.RequestException, ValueError) as e:
+            if not client.fallback:
+                raise
+            client.record_fallback("random.org", len(block))
+            print(f"Error fetching atmospheric noise: {e}. Using fallback uniform noise for {len(block)} rows.")
+            noise[block] = np.random.uniform(min_int[block], max_int[block])
+
+    if as_float:
+        noise[valid] = randomorg_to_float(noise[valid], factor[valid], offset[valid])
+
+    return noise
+
+ANU_URL = "https://api.quantumnumbers.anu.edu.au/"
+ANU_MAX_LENGTH = 1024  # maximum array length per request
+ANU_MAX_BLOCK_SIZE = 10  # maximum block size per element for the hex types
+ANU_SAMPLE_BYTES = {"uint8": 1, "hex8": 1, "uint16": 2, "hex16": 2}
+ANU_RATE_LIMIT = 1.0  # maximum requests per second to the ANU API
+
+def _request_anu_block(length, data_type, size, API_KEY, url=None, client=None):
+    """
+    Requests one array of quantum random numbers from the ANU Quantum Random Number API (at ANU_URL unless url is given).
+    """
+    headers = {'x-api-key': API_KEY}
+    params = {
+        "length": length,
+        "type": data_type,
+        "size": size
+    }
+    client = client or get_default_client()
+    hex_type = data_type.startswith("hex")
+    sample_bytes = ANU_SAMPLE_BYTES[data_type]
+    element_values = size if hex_type else 1
+    key = f"{data_type}:{size}"
+
+    if client.replaying():
+        values = client.store.replay("anu", key, length * element_values)
+        if hex_type:
+            # recorded hex samples are stored big-endian, re-split them into the API's per-element strings
+            raw = values.astype(">u" + str(sample_bytes)).tobytes()
+            element_bytes = element_values * sample_bytes
+            return [raw[i:i + element_bytes].hex() for i in range(0, len(raw), element_bytes)]
+        return values.tolist()
+
+    response = client.request("anu", "GET", url or ANU_URL, headers=headers, params=params)
+    data = response.json()
+    if not data.get("success", False):
+        client.record_failure("anu")
+        raise ValueError(f"Quantum API error: {data.get('message', 'Unknown error')}")
+
+    if client.store is not None:
+        if hex_type:
+            values = np.frombuffer(bytes.fromhex("".join(data["data"])), dtype=">u" + str(sample_bytes))
+        else:
+            values = np.asarray(data["data"])
+        client.store.record("anu", key, values.astype("<u" + str(sample_bytes)))
+    return data["data"]
+
+def fetch_quantum_entropy(num_values, min_val, max_val, API_KEY, client=None):
     """
     Fetches quantum entropy-based random numbers from the ANU Quantum Random Number API.
-    Falls back to uniform distribution if the request fails.
+    Falls back to uniform distribution if the request fails, unless the client has fallback disabled.
     """
+    client = client or get_default_client()
     try:
         min_val, max_val, factor, offset = format_float_for_api(min_val, max_val)
     except ValueError:
@@ -138,25 +446,178 @@ def fetch_quantum_entropy(num_values, min_val, max_val, API_KEY):
     if min_val > max_val:
         min_val, max_val = max_val, min_val
     
-    url = "https://api.quantumnumbers.anu.edu.au/"
-    headers = {'x-api-key': API_KEY}
-    params = {
-        "length": num_values,
-        "type": "uint8",
-        "size": 1
-    }
-    
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not data.get("success", False):
-            raise ValueError(f"Quantum API error: {data.get('message', 'Unknown error')}")
-        
-        random_values = np.array(data["data"]) / 255.0  
+        data = _request_anu_block(num_values, "uint8", 1, API_KEY, client=client)
+        random_values = np.array(data) / 255.0  
         scaled_values = min_val + random_values * (max_val - min_val)
         return scaled_values
     
     except (requests.RequestException, ValueError) as e:
+        if not client.fallback:
+            raise
+        client.record_fallback("anu", num_values)
         print(f"Error fetching quantum entropy: {e}. Using fallback uniform noise.")
-        return np.random.uniform(min_val, max_val, size=num_values)
\ No newline at end of file
+        return np.random.uniform(min_val, max_val, size=num_values)
+
+
+class QuantumEntropyPool:
+    """
+    Prefetching buffer of ANU quantum random numbers.
+    Every request pulls the API's maximum block (ANU_MAX_LENGTH elements, each of block_size samples for the hex
+    types) and any number of values is then served from the buffer. Once the buffer drops below low_water bytes a
+    background thread fetches the next block. Requests, background ones included, start at most rate per second
+    (ANU_RATE_LIMIT unless given, 0 for no limit), however many threads share the pool.
+    """
+
+    def __init__(self, API_KEY, data_type="hex16", block_size=ANU_MAX_BLOCK_SIZE, low_water=None, url=None, client=None, rate=None):
+        if data_type not in ANU_SAMPLE_BYTES:
+            raise ValueError(f"Unsupported ANU data type: {data_type}. Options: {', '.join(ANU_SAMPLE_BYTES)}")
+
+        self.API_KEY = API_KEY
+        self.data_type = data_type
+        self.block_size = block_size if data_type.startswith("hex") else 1
+        self.url = url
+        self.client = client or get_default_client()
+        self.sample_bytes = ANU_SAMPLE_BYTES[data_type]
+        self.max_level = 2 ** (8 * self.sample_bytes) - 1
+        self.request_bytes = ANU_MAX_LENGTH * self.block_size * self.sample_bytes
+        self.low_water = self.request_bytes // 2 if low_water is None else low_water
+        self.requests_made = 0
+        rate = ANU_RATE_LIMIT if rate is None else rate
+        self.interval = 1.0 / rate if rate else 0.0
+
+        self._buffer = bytearray()
+        self._lock = threading.Lock()
+        self._refill_lock = threading.Lock()
+        self._refill_thread = None
+        self._refill_error = None
+        self._rate_lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def _wait_for_slot(self):
+        # the same spacing as async_fetch.RateLimiter, for the threads that fetch through the pool
+        with self._rate_lock:
+            now = time.monotonic()
+            if self._next_slot > now:
+                time.sleep(self._next_slot - now)
+                now = self._next_slot
+            self._next_slot = now + self.interval
+
+    def _fetch(self):
+        if self.client.replaying() == False:
+            self._wait_for_slot()
+        data = _request_anu_block(ANU_MAX_LENGTH, self.data_type, self.block_size, self.API_KEY, self.url, self.client)
+        if self.data_type.startswith("hex"):
+            # hex samples are big-endian, block_size of them concatenated per element
+            raw = bytes.fromhex("".join(data))
+        else:
+            raw = np.asarray(data, dtype=">u" + str(self.sample_bytes)).tobytes()
+
+        with self._lock:
+            self._buffer += raw
+            self.requests_made += 1
+
+    def _background_refill(self):
+        try:
+            self._fetch()
+        except (requests.RequestException, ValueError, LookupError) as e:  # LookupError: EntropyStoreExhausted
+            self._refill_error = e
+
+    def _start_refill(self):
+        if self.client.replaying():
+            # replay serves exactly the recorded blocks, prefetching would read past the end of the recording
+            return
+        with self._refill_lock:
+            if self._refill_thread is None or not self._refill_thread.is_alive():
+                # only publish the thread once it has started, take() may join it from another thread
+                refill_thread = threading.Thread(target=self._background_refill, daemon=True)
+                refill_thread.start()
+                self._refill_thread = refill_thread
+
+    def available(self):
+        """
+        Number of samples currently buffered.
+        """
+        with self._lock:
+            return len(self._buffer) // self.sample_bytes
+
+    def take(self, num_values):
+        """
+        Returns num_values raw samples from the buffer, fetching more blocks only when the buffer cannot cover them.
+        """
+        needed = num_values * self.sample_bytes
+
+        # a background refill may already be bringing in the missing bytes
+        refill_thread = self._refill_thread
+        if refill_thread is not None and len(self._buffer) < needed:
+            refill_thread.join()
+        if self._refill_error is not None:
+            error, self._refill_error = self._refill_error, None
+            raise error
+
+        while True:
+            with self._lock:
+                if len(self._buffer) >= needed:
+                    raw = bytes(self._buffer[:needed])
+                    del self._buffer[:needed]
+                    remaining = len(self._buffer)
+                    break
+            self._fetch()
+
+        if remaining < self.low_water:
+            self._start_refill()
+
+        return np.frombuffer(raw, dtype=">u" + str(self.sample_bytes)).astype(np.int64)
+
+    def uniform(self, num_values):
+        """
+        Returns num_values quantum random numbers scaled onto [0, 1].
+        """
+        return self.take(num_values) / self.max_level
+
+
+def fetch_uniform_batch(min_vals, max_vals, draw, source="local", client=None):
+    """
+    Scales one uniform [0, 1] draw onto every [min_val, max_val] row, the same way as fetch_quantum_entropy.
+    draw(num_values) returns the uniform values (e.g. QuantumEntropyPool.uniform or an EntropySource's fill).
+    Falls back to uniform distribution if the draw fails and client allows it; without a client the error is raised.
+    """
+    min_int, max_int, _, _, valid = format_float_for_api_batch(min_vals, max_vals)
+    high = np.maximum(min_int, max_int)
+    low = np.minimum(min_int, max_int, out=min_int)
+    noise = np.empty(len(min_int), dtype=np.float64)
+
+    if not valid.all():
+        print(f"[ X ] Invalid range for {np.count_nonzero(~valid)} rows. Min and max values must be different and finite.")
+        noise[~valid] = np.random.uniform(0, 1, size=np.count_nonzero(~valid))
+
+    try:
+        random_values = draw(int(np.count_nonzero(valid)))
+        if valid.all():
+            # low + random_values * (high - low), computed in place
+            np.subtract(high, low, out=noise, casting="unsafe")
+            noise *= random_values
+            noise += low
+        else:
+            noise[valid] = low[valid] + random_values * (high[valid] - low[valid])
+    except (OSError, ValueError) as e:  # requests.RequestException is an OSError
+        if client is None or not client.fallback:
+            raise
+        client.record_fallback(source, np.count_nonzero(valid))
+        print(f"Error fetching {source} entropy: {e}. Using fallback uniform noise.")
+        noise[valid] = np.random.uniform(low[valid], high[valid])
+
+    return noise
+
+
+@timed("fetch anu")
+def fetch_quantum_entropy_batch(min_vals, max_vals, API_KEY, pool=None):
+    """
+    Fetches one quantum random number for every [min_val, max_val] row from a QuantumEntropyPool.
+    Each row is scaled the same way as fetch_quantum_entropy, but at 16-bit precision (65536 levels instead of 256)
+    with the default hex16 pool.
+    Falls back to uniform distribution if the pool cannot be filled, unless its client has fallback disabled.
+    """
+    if pool is None:
+        pool = QuantumEntropyPool(API_KEY)
+    return fetch_uniform_batch(min_vals, max_vals, pool.uniform, "anu", pool.client)
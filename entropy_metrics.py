@@ -0,0 +1,246 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+from numpy.lib.stride_tricks import sliding_window_view
+from instrumentation import stage
+
+METRICS_WINDOW = 256  # values per window (rolling metrics) or block (sample and approximate entropy)
+SHANNON_BINS = 16
+PERMUTATION_ORDER = 3
+PERMUTATION_DELAY = 1
+SAMPLE_M = 2  # template length
+SAMPLE_R = 0.2  # match tolerance, in standard deviations of the block
+COUNT_BLOCK_ROWS = 65_536  # windows per pass of the rolling counts, bounds their memory
+PAIR_CHUNK = 4_000_000  # candidate template pairs compared at once
+
+
+@dataclass
+class EntropyMetrics:
+    """
+    How much entropy a series holds, from windows of METRICS_WINDOW values.
+    """
+    rows: int
+    shannon: float  # mean rolling Shannon entropy of the value histogram, 0 to 1 (divided by log2 of the bins)
+    permutation: float  # mean rolling permutation entropy, 0 to 1 (divided by log2 of order!)
+    sample: float  # mean sample entropy of the blocks, nan when no block has a match of length m + 1
+    approximate: float  # mean approximate entropy of the blocks
+
+    def __str__(self):
+        return (f"shannon={self.shannon:.4f} permutation={self.permutation:.4f} "
+                f"sample={self.sample:.4f} approximate={self.approximate:.4f}")
+
+
+def _entropy_bits(counts):
+    # Shannon entropy (bits) of every row of counts, 0 log 0 counting as 0
+    counts = np.asarray(counts, dtype=np.float64)
+    total = np.sum(counts, axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = counts / total
+        return -np.sum(np.where(p > 0, p * np.log2(p), 0.0), axis=-1)
+
+
+def rolling_counts(codes, window, num_codes):
+    """
+    Yields (start, counts) blocks, counts[i] holding how often each code 0 to num_codes - 1 occurs in
+    codes[start + i : start + i + window]. Each block is a difference of two rows of a one-hot cumulative sum, so
+    every window costs O(num_codes) whatever its length. Codes outside 0 to num_codes - 1 are not counted.
+    """
+    num_windows = len(codes) - window + 1
+    for start in range(0, max(num_windows, 0), COUNT_BLOCK_ROWS):
+        block = min(COUNT_BLOCK_ROWS, num_windows - start)
+        segment = codes[start:start + block + window - 1]
+        cumulative = np.zeros((len(segment) + 1, num_codes), dtype=np.int32)
+        np.cumsum(segment[:, None] == np.arange(num_codes), axis=0, out=cumulative[1:])
+        yield start, cumulative[window:] - cumulative[:-window]
+
+
+def shannon_entropy_rolling(vals, window=METRICS_WINDOW, bins=SHANNON_BINS):
+    """
+    Shannon entropy (bits) of the histogram of the window values ending at every row, NaN for the first
+    window - 1 rows. The bins are equally wide over the range of the whole series, so the windows are comparable,
+    and every value is binned once. NaN values are left out of their windows.
+    """
+    values = np.asarray(vals, dtype=np.float64)
+    profile = np.full(len(values), np.nan)
+    finite = np.isfinite(values)
+    if window < 1 or len(values) < window or not finite.any():
+        return profile
+
+    low, high = np.min(values[finite]), np.max(values[finite])
+    scale = bins / (high - low) if high > low else 0.0
+    codes = np.full(len(values), bins, dtype=np.int64)  # NaN values get a code that is never counted
+    codes[finite] = np.minimum(((values[finite] - low) * scale).astype(np.int64), bins - 1)
+
+    for start, counts in rolling_counts(codes, window, bins):
+        profile[window - 1 + start : window - 1 + start + len(counts)] = _entropy_bits(counts)
+    return profile
+
+
+def ordinal_patterns(vals, order=PERMUTATION_ORDER, delay=PERMUTATION_DELAY):
+    """
+    Encodes the ordinal pattern of every run of order values (delay apart) as one integer from 0 to order! - 1,
+    its Lehmer code: each value counts the later values below it, weighted by the factorial of the positions left.
+    Equal values keep their order, as in a stable argsort.
+    """
+    values = np.asarray(vals, dtype=np.float64)
+    num_patterns = len(values) - (order - 1) * delay
+    codes = np.zeros(max(num_patterns, 0), dtype=np.int64)
+    if num_patterns < 1:
+        return codes
+
+    runs = [values[j * delay : j * delay + num_patterns] for j in range(order)]
+    for j in range(order - 1):
+        smaller = np.zeros(num_patterns, dtype=np.int64)
+        for k in range(j + 1, order):
+            smaller += runs[k] < runs[j]
+        codes += smaller * math.factorial(order - 1 - j)
+    return codes
+
+
+def permutation_entropy_rolling(vals, window=METRICS_WINDOW, order=PERMUTATION_ORDER, delay=PERMUTATION_DELAY):
+    """
+    Permutation entropy (bits) of the ordinal patterns that fit in the window values ending at every row, NaN for
+    the first window - 1 rows. Every pattern is encoded once and the windows share its count.
+    """
+    values = np.asarray(vals, dtype=np.float64)
+    profile = np.full(len(values), np.nan)
+    patterns_per_window = window - (order - 1) * delay
+    if patterns_per_window < 1 or len(values) < window:
+        return profile
+
+    codes = ordinal_patterns(values, order, delay)
+    for start, counts in rolling_counts(codes, patterns_per_window, math.factorial(order)):
+        profile[window - 1 + start : window - 1 + start + len(counts)] = _entropy_bits(counts)
+    return profile
+
+
+def _neighbour_counts(blocks, length, num_templates, r):
+    """
+    For every block (row of blocks), counts the templates (runs of length values) within r of each of its first
+    num_templates templates, itself included, using the Chebyshev distance. Sorted-neighbour counting: the
+    templates are sorted by block and first value, so only the templates after each one up to r further along its
+    first value are compared, in vectorized chunks of about PAIR_CHUNK candidate pairs.
+    """
+    num_blocks = len(blocks)
+    templates = sliding_window_view(blocks, length, axis=1)[:, :num_templates].reshape(-1, length)
+    first = templates[:, 0]
+
+    # one increasing key for all blocks, each block's first values shifted past the previous block's
+    span = np.max(first) - np.min(first) + 2 * r + 1
+    keys = np.repeat(np.arange(num_blocks) * span, num_templates) + first
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    columns = [np.ascontiguousarray(templates[order, k]) for k in range(length)]  # one array per template position
+    ends = np.searchsorted(keys, keys + r + 1e-9 * max(1.0, abs(keys[-1])), side="right")  # slack for the key rounding
+
+    counts = np.ones(len(keys), dtype=np.int64)  # every template matches itself
+    candidates = np.cumsum(ends - np.arange(len(keys)) - 1)
+    start = 0
+    while start < len(keys):
+        # templates start to stop have about PAIR_CHUNK candidates between them
+        base = candidates[start - 1] if start else 0
+        stop = max(int(np.searchsorted(candidates, base + PAIR_CHUNK, side="right")), start + 1)
+        sizes = ends[start:stop] - np.arange(start, stop) - 1
+        left = np.repeat(np.arange(start, stop), sizes)
+        right = left + 1 + np.arange(len(left)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        # the first values are within r already (up to the slack), every other position narrows the pairs down
+        for column in columns[1:] + columns[:1]:
+            matched = np.abs(column[left] - column[right]) <= r
+            left, right = left[matched], right[matched]
+        counts += np.bincount(left, minlength=len(keys)) + np.bincount(right, minlength=len(keys))
+        start = stop
+
+    unsorted = np.empty_like(counts)
+    unsorted[order] = counts
+    return unsorted.reshape(num_blocks, num_templates)
+
+
+def block_entropies(vals, window=METRICS_WINDOW, m=SAMPLE_M, r=SAMPLE_R):
+    """
+    Sample and approximate entropy of every consecutive block of window values (one block of the whole series when
+    window is None), the tolerance being r standard deviations of the block. A trailing partial block is dropped.
+    Template matches are counted on sorted templates instead of comparing every pair of templates.
+    Returns (sample, approximate) arrays with one value per block, sample being NaN for blocks without a match.
+    """
+    values = np.asarray(vals, dtype=np.float64)
+    window = window or len(values)
+    num_blocks = len(values) // window if window > m + 1 else 0
+    if num_blocks == 0:
+        return np.zeros(0), np.zeros(0)
+
+    blocks = values[:num_blocks * window].reshape(num_blocks, window)
+    # each block in units of its own standard deviation, so one tolerance fits all of them
+    spread = np.std(blocks, axis=1, keepdims=True)
+    blocks = (blocks - np.mean(blocks, axis=1, keepdims=True)) / np.where(spread > 0, spread, 1)
+
+    n = window
+    counts_m = _neighbour_counts(blocks, m, n - m + 1, r)
+    counts_m1 = _neighbour_counts(blocks, m + 1, n - m, r)
+
+    # sample entropy: pairs of distinct templates among the first n - m, which excludes the last length-m template
+    last = blocks[:, None, n - m:]
+    last_matches = np.sum(np.max(np.abs(sliding_window_view(blocks, m, axis=1)[:, :n - m] - last), axis=2) <= r, axis=1)
+    similar_m = np.sum(counts_m[:, :n - m] - 1, axis=1) - last_matches
+    similar_m1 = np.sum(counts_m1 - 1, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sample = np.where((similar_m > 0) & (similar_m1 > 0), -np.log(similar_m1 / similar_m), np.nan)
+
+    # approximate entropy: the mean log share of matching templates (self matches included) at m and m + 1
+    approximate = np.mean(np.log(counts_m / (n - m + 1)), axis=1) - np.mean(np.log(counts_m1 / (n - m)), axis=1)
+    return sample, approximate
+
+
+def sample_entropy(vals, window=METRICS_WINDOW, m=SAMPLE_M, r=SAMPLE_R):
+    """
+    Sample entropy of every block of window values, see block_entropies.
+    """
+    return block_entropies(vals, window, m, r)[0]
+
+
+def approximate_entropy(vals, window=METRICS_WINDOW, m=SAMPLE_M, r=SAMPLE_R):
+    """
+    Approximate entropy of every block of window values, see block_entropies.
+    """
+    return block_entropies(vals, window, m, r)[1]
+
+
+def _mean(values):
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    return float(np.mean(values)) if len(values) else np.nan
+
+
+def entropy_metrics(vals, window=METRICS_WINDOW):
+    """
+    Computes the EntropyMetrics of a 1-D series. Series shorter than window are measured as a single window.
+    """
+    values = np.asarray(vals, dtype=np.float64)
+    window = max(min(window, len(values)), 1)
+
+    with stage("shannon entropy"):
+        shannon = _mean(shannon_entropy_rolling(values, window)) / math.log2(SHANNON_BINS)
+    with stage("permutation entropy"):
+        permutation = _mean(permutation_entropy_rolling(values, window)) / math.log2(math.factorial(PERMUTATION_ORDER))
+    with stage("sample entropy"):
+        sample, approximate = block_entropies(values, window)
+
+    return EntropyMetrics(
+        rows=len(values),
+        shannon=shannon,
+        permutation=permutation,
+        sample=_mean(sample),
+        approximate=_mean(approximate),
+    )
+
+
+def print_entropy_metrics(series, window=METRICS_WINDOW):
+    """
+    Prints the EntropyMetrics of every (name, values) in series, one line each, and returns them by name.
+    """
+    print("[ ! ] Entropy metrics (windows of " + str(window) + " values):")
+    metrics = {}
+    width = max(len(name) for name, _ in series)
+    for name, values in series:
+        metrics[name] = entropy_metrics(values, window)
+        print(f"      {name:<{width}}  {metrics[name]}")
+    return metrics
@@ -0,0 +1,194 @@
+import os
+import numpy as np
+from typing import Protocol, runtime_checkable
+from entropy_client import get_default_client
+from entropy_methods import (
+    QuantumEntropyPool, fetch_uniform_batch, _request_random_org_integers,
+    RANDOM_ORG_MAX_INT, RANDOM_ORG_MAX_BLOCK,
+)
+from instrumentation import stage
+
+UNIT_SCALE = 2.0 ** -53  # 53 random bits fill a float64 mantissa
+HWRNG_PATH = "/dev/hwrng"
+
+
+@runtime_checkable
+class EntropySource(Protocol):
+    """
+    A batched source of random numbers. fill(num_values) returns num_values draws as a float64 array, uniform on
+    [0, 1] for "uniform" sources and standard normal for "normal" ones.
+    Remote sources also have a client, whose fallback setting decides what happens when a draw fails.
+    """
+    name: str
+    distribution: str
+    description: str
+
+    def fill(self, num_values): ...
+
+
+def _bits_to_unit(raw):
+    # 8 bytes per value, the top 53 bits give a uniform float on [0, 1)
+    return (np.frombuffer(raw, dtype=np.uint64) >> np.uint64(11)) * UNIT_SCALE
+
+
+class GaussianSource:
+    """
+    Standard normal draws from NumPy. seed may be a seed or an np.random.Generator.
+    """
+    name = "gaussian"
+    distribution = "normal"
+    description = "Gaussian Noise (local)"
+
+    def __init__(self, seed=None, **settings):
+        self.rng = np.random.default_rng(seed)
+
+    def fill(self, num_values):
+        return self.rng.standard_normal(num_values)
+
+
+class PCG64Source:
+    """
+    Seedable uniform draws from NumPy's PCG64 generator.
+    """
+    name = "pcg64"
+    distribution = "uniform"
+    description = "PCG64 Noise (local, seedable)"
+
+    def __init__(self, seed=None, **settings):
+        self.rng = np.random.Generator(np.random.PCG64(seed))
+
+    def fill(self, num_values):
+        return self.rng.random(num_values)
+
+
+class UrandomSource:
+    """
+    Uniform draws from the operating system's CSPRNG (os.urandom, the same pool the secrets module reads).
+    """
+    name = "urandom"
+    distribution = "uniform"
+    description = "OS Noise (local, os.urandom)"
+
+    def __init__(self, **settings):
+        pass
+
+    def fill(self, num_values):
+        return _bits_to_unit(os.urandom(8 * num_values))
+
+
+class FileSource:
+    """
+    Uniform draws from the raw bytes of a file or device, e.g. a hardware RNG at /dev/hwrng.
+    Registered as hwrng only on machines where HWRNG_PATH can be read.
+    """
+    name = "hwrng"
+    distribution = "uniform"
+    description = "Hardware RNG (local, /dev/hwrng)"
+
+    def __init__(self, path=HWRNG_PATH, **settings):
+        if os.access(path, os.R_OK) == False:
+            raise ValueError(f"Cannot read random bytes from {path}, the device does not exist or is not readable.")
+        self.path = path
+        self._file = None
+
+    def fill(self, num_values):
+        if self._file is None:
+            self._file = open(self.path, "rb", buffering=0)
+
+        needed = 8 * num_values
+        chunks = []
+        while needed > 0:
+            # devices may return fewer bytes than asked for
+            chunk = self._file.read(needed)
+            if not chunk:
+                raise ValueError(f"{self.path} ran out of random bytes.")
+            chunks.append(chunk)
+            needed -= len(chunk)
+        return _bits_to_unit(b"".join(chunks))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class RandomOrgSource:
+    """
+    Uniform draws from random.org's atmospheric noise, RANDOM_ORG_MAX_BLOCK integers per request.
+    """
+    name = "random.org"
+    distribution = "uniform"
+    description = "Atmospheric Noise (API, uniform draws)"
+
+    def __init__(self, RANDOM_API_KEY=None, client=None, **settings):
+        self.RANDOM_API_KEY = RANDOM_API_KEY
+        self.client = client or get_default_client()
+
+    def fill(self, num_values):
+        num_values = int(num_values)  # NumPy integers cannot be JSON-encoded in the request
+        values = np.empty(num_values, dtype=np.float64)
+        for start in range(0, num_values, RANDOM_ORG_MAX_BLOCK):
+            block = min(RANDOM_ORG_MAX_BLOCK, num_values - start)
+            raw = _request_random_org_integers(block, 0, RANDOM_ORG_MAX_INT, self.RANDOM_API_KEY, self.client)
+            values[start:start + block] = raw / (RANDOM_ORG_MAX_INT + 1)
+        return values
+
+
+class AnuSource:
+    """
+    Uniform draws from the ANU quantum random numbers, served by a prefetching QuantumEntropyPool.
+    """
+    name = "anu"
+    distribution = "uniform"
+    description = "Quantum Noise (API, uniform draws)"
+
+    def __init__(self, QUANTUM_API_KEY=None, client=None, pool=None, **settings):
+        self.pool = pool or QuantumEntropyPool(QUANTUM_API_KEY, client=client)
+        self.client = self.pool.client
+
+    def fill(self, num_values):
+        return self.pool.uniform(num_values)
+
+
+# source name -> class, every class taking keyword settings (seed, API keys, client) and ignoring the rest
+SOURCES = {}
+
+
+def register_source(source_class, name=None):
+    """
+    Adds an EntropySource class to the registry under name (its name attribute by default).
+    Uniform sources registered here can be used as a generation method without any other change.
+    """
+    SOURCES[name or source_class.name] = source_class
+    return source_class
+
+
+def available_sources(distribution=None):
+    """
+    Names of the registered sources, optionally only those with the given distribution.
+    """
+    return [name for name, source_class in SOURCES.items() if distribution is None or source_class.distribution == distribution]
+
+
+def create_source(name, **settings):
+    """
+    Creates the registered source name. settings may hold seed, RANDOM_API_KEY, QUANTUM_API_KEY and client.
+    """
+    if name not in SOURCES:
+        raise ValueError(f"Unknown entropy source: {name}. Options: {', '.join(SOURCES)}")
+    return SOURCES[name](**settings)
+
+
+def fetch_source_batch(min_vals, max_vals, source):
+    """
+    Draws one value for every [min_val, max_val] row from a uniform source, with the fallback handling of
+    fetch_uniform_batch (sources without a client raise on failure).
+    """
+    with stage("fetch " + source.name):
+        return fetch_uniform_batch(min_vals, max_vals, source.fill, source.name, getattr(source, "client", None))
+
+
+for _source_class in (GaussianSource, PCG64Source, UrandomSource, FileSource, RandomOrgSource, AnuSource):
+    # the hardware RNG is only offered (in the menu, --method and the sweep) where the machine has one
+    if _source_class is not FileSource or os.access(HWRNG_PATH, os.R_OK):
+        register_source(_source_class)
@@ -0,0 +1,149 @@
+import os
+import json
+import threading
+import numpy as np
+
+
+class EntropyStoreExhausted(LookupError):
+    """
+    Raised in replay mode when a request asks for more entropy than was recorded for it.
+    """
+
+
+class EntropyStore:
+    """
+    On-disk store of the raw entropy blocks pulled from the remote sources.
+    Blocks are appended to one binary data file and indexed by source, request key and offset in a JSON sidecar,
+    and are read back through a memory map of the data file.
+
+    Modes:
+        record - every fetched block is appended to the store.
+        replay - requests are served from the recorded blocks in order, with no network access at all.
+
+    Once the data file grows past max_bytes the oldest blocks are evicted and the file is compacted.
+    """
+
+    def __init__(self, path="output/entropy_store", mode="record", max_bytes=256 * 1024 ** 2):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Invalid entropy store mode: {mode}. Options: record, replay")
+
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.data_path = path + ".bin"
+        self.index_path = path + ".json"
+
+        directory = os.path.dirname(self.data_path)
+        if directory and os.path.exists(directory) == False:
+            os.makedirs(directory)
+
+        self.blocks = []
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r") as file:
+                self.blocks = json.load(file)["blocks"]
+        if os.path.exists(self.data_path) == False:
+            open(self.data_path, "wb").close()
+
+        self._map = None
+        self._cursors = {}  # (source, key) -> (block position, values already served from it)
+        self._lock = threading.Lock()
+
+    def size(self):
+        return sum(block["length"] for block in self.blocks)
+
+    def _data(self):
+        # the memory map has a fixed size, so it is reopened after every append
+        if self._map is None and os.path.getsize(self.data_path) > 0:
+            self._map = np.memmap(self.data_path, dtype=np.uint8, mode="r")
+        return self._map
+
+    def _save_index(self):
+        with open(self.index_path, "w") as file:
+            json.dump({"blocks": self.blocks}, file)
+
+    def record(self, source, key, values):
+        """
+        Appends one block of values fetched for (source, key).
+        """
+        if self.mode != "record":
+            return
+
+        values = np.ascontiguousarray(values)
+        with self._lock:
+            offset = os.path.getsize(self.data_path)
+            with open(self.data_path, "ab") as file:
+                file.write(values.tobytes())
+            self.blocks.append({
+                "source": source,
+                "key": key,
+                "offset": offset,
+                "length": values.nbytes,
+                "dtype": values.dtype.str,
+            })
+            self._map = None
+            if self.size() > self.max_bytes:
+                self._evict()
+            self._save_index()
+
+    def _evict(self):
+        # drop the oldest blocks until the store fits, then rewrite the data file without them
+        total = self.size()
+        while self.blocks and total > self.max_bytes:
+            total -= self.blocks.pop(0)["length"]
+
+        data = self._data()
+        compacted_path = self.data_path + ".tmp"
+        offset = 0
+        with open(compacted_path, "wb") as file:
+            for block in self.blocks:
+                file.write(data[block["offset"]:block["offset"] + block["length"]].tobytes())
+                block["offset"] = offset
+                offset += block["length"]
+
+        self._map = None
+        del data
+        os.replace(compacted_path, self.data_path)
+        self._cursors = {}
+
+    def replay(self, source, key, num_values):
+        """
+        Returns the next num_values recorded for (source, key), continuing where the previous replay stopped.
+        """
+        with self._lock:
+            matching = [block for block in self.blocks if block["source"] == source and block["key"] == key]
+            position, served = self._cursors.get((source, key), (0, 0))
+            data = self._data()
+            parts = []
+            remaining = num_values
+
+            while remaining > 0:
+                if position >= len(matching):
+                    raise EntropyStoreExhausted(f"No recorded entropy left for {source} ({key}).")
+                block = matching[position]
+                values = np.frombuffer(data, dtype=block["dtype"], count=block["length"] // np.dtype(block["dtype"]).itemsize, offset=block["offset"])
+                take = values[served:served + remaining]
+                parts.append(take)
+                remaining -= len(take)
+                served += len(take)
+                if served >= len(values):
+                    position, served = position + 1, 0
+
+            self._cursors[(source, key)] = (position, served)
+            return np.concatenate(parts) if parts else np.empty(0)
+
+    def rewind(self):
+        """
+        Starts replay from the first recorded block again.
+        """
+        self._cursors = {}
+
+    def positions(self):
+        """
+        Returns the replay position of every (source, key) as [source, key, block position, values served] lists,
+        so a later run can carry on from the same point with seek().
+        """
+        with self._lock:
+            return [[source, key, position, served] for (source, key), (position, served) in self._cursors.items()]
+
+    def seek(self, positions):
+        with self._lock:
+            self._cursors = {(source, key): (position, served) for source, key, position, served in positions}
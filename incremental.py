@@ -0,0 +1,173 @@
+import io
+import os
+import json
+import time
+import pandas as pd
+from ingest import parse_column
+from runner import client_for
+from streaming import StreamProcessor, _append_csv
+from instrumentation import stage, count
+
+STATE_FILE = "incremental_state.json"
+READ_BLOCK_BYTES = 16 * 1024 * 1024  # new rows are parsed in blocks of about this size
+STATE_VERSION = 1
+
+
+def _settings(config):
+    # everything the saved state depends on, a rerun with other settings cannot carry on from it
+    return {
+        "dataset_file": os.path.abspath(config.dataset_file),
+        "column_name": config.column_name,
+        "method": config.method,
+        "standard_deviation_range": config.standard_deviation_range,
+        "deviation_method": config.deviation_method,
+        "auto_correlation": config.auto_correlation,
+        "correlation_scale": config.correlation_scale,
+        "correlation_multiplier": config.correlation_multiplier,
+        "auto_correlation_rolling": config.auto_correlation_rolling,
+        "seed": config.seed,
+    }
+
+
+def load_state(path):
+    if os.path.exists(path) == False:
+        return None
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def save_state(path, state):
+    # written to a temporary file first, so an interrupted save never leaves a half-written state behind
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(state, file)
+    os.replace(temporary_path, path)
+
+
+def _complete_end(file, offset):
+    """
+    Returns the byte position just after the last complete line at or after offset, so a row that is still being
+    appended is left for the next update.
+    """
+    end = file.seek(0, os.SEEK_END)
+    block_size = 64 * 1024
+    while end > offset:
+        start = max(end - block_size, offset)
+        file.seek(start)
+        newline = file.read(end - start).rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        end = start
+    return offset
+
+
+def _new_rows(file, offset, end, column_names, column_name):
+    """
+    Yields (values, position) for the rows between offset and end, one block of about READ_BLOCK_BYTES at a time:
+    the parsed column_name values of the block and the byte position just after its last row.
+    """
+    file.seek(offset)
+    remainder = b""
+    position = offset
+    while position < end:
+        data = remainder + file.read(min(READ_BLOCK_BYTES, end - position))
+        position = file.tell()
+        cut = len(data) if position >= end else data.rfind(b"\n") + 1
+        block, remainder = data[:cut], data[cut:]
+        if block.strip():
+            rows = pd.read_csv(io.BytesIO(block), header=None, names=column_names, usecols=[column_name])
+            yield parse_column(rows[column_name], column_name), position - len(remainder)
+
+
+def update(config, state_path=None):
+    """
+    Processes only the rows appended to config.dataset_file since the previous update and appends their generated
+    values and differences to random_values.csv and comparisons.csv in config.output_dir.
+    The read offset, the trailing windows and correlation blocks, the local generator and entropy store positions
+    are saved to state_path (output_dir/incremental_state.json by default) after every block written, so an update
+    that fails part way leaves a state matching the rows already in the outputs. Without a state the
+    whole file is processed and the outputs are started afresh. As the feed has no end, the last
+    standard_deviation_range - 1 rows wait for the rows after them before they are written.
+    Returns the number of rows written by this update.
+    """
+    if config.column_names:
+        raise ValueError("Incremental mode processes a single column.")
+    state_path = state_path or os.path.join(config.output_dir, STATE_FILE)
+    if os.path.exists(config.output_dir) == False:
+        os.makedirs(config.output_dir)
+
+    client = client_for(config)
+    correlation = None
+    if config.auto_correlation:
+        correlation = (config.correlation_scale, config.correlation_multiplier, config.auto_correlation_rolling)
+    processor = StreamProcessor(
+        config.method, config.standard_deviation_range, config.deviation_method,
+        config.RANDOM_API_KEY, config.QUANTUM_API_KEY, config.seed, correlation, client,
+    )
+
+    state = load_state(state_path)
+    if state is not None and state["settings"] != _settings(config):
+        raise ValueError(f"{state_path} was saved with other settings. Remove it to start a new incremental run.")
+
+    with open(config.dataset_file, "rb") as file:
+        header = file.readline()
+        column_names = list(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+
+        if state is None:
+            print("[ ! ] Starting a new incremental run of " + config.dataset_file + ".")
+            state = {"version": STATE_VERSION, "settings": _settings(config), "offset": len(header), "rows_written": 0}
+            mode = "w"
+        else:
+            processor.set_state(state["processor"])
+            if client is not None and client.store is not None and "store_positions" in state:
+                client.store.seek(state["store_positions"])
+            mode = "a"
+
+        if file.seek(0, os.SEEK_END) < state["offset"]:
+            raise ValueError(f"{config.dataset_file} is shorter than when it was last processed. Remove {state_path} to start again.")
+
+        end = _complete_end(file, state["offset"])
+        written = 0
+        with open(os.path.join(config.output_dir, "random_values.csv"), mode, newline="") as random_file, \
+                open(os.path.join(config.output_dir, "comparisons.csv"), mode, newline="") as comparison_file:
+            for values, position in _new_rows(file, state["offset"], end, column_names, config.column_name):
+                count("rows read", len(values))
+                original, generated, difference = processor.feed(values)
+                if len(original):
+                    with stage("write csv"):
+                        header_needed = state["rows_written"] == 0
+                        _append_csv(generated, random_file, header=header_needed)
+                        _append_csv(difference, comparison_file, header=header_needed)
+                        random_file.flush()
+                        comparison_file.flush()
+                    written += len(original)
+
+                # the rows are on disk, the state now moves past them
+                state["offset"] = position
+                state["rows_written"] += len(original)
+                state["processor"] = processor.get_state()
+                if client is not None and client.store is not None:
+                    state["store_positions"] = client.store.positions()
+                save_state(state_path, state)
+
+    # also covers updates without new rows (a new run still records its settings) and trailing blank lines
+    state["offset"] = end
+    state["processor"] = processor.get_state()
+    save_state(state_path, state)
+
+    return written
+
+
+def follow(config, state_path=None, interval=5.0):
+    """
+    Like tail -f: keeps calling update() every interval seconds until interrupted with Ctrl+C.
+    """
+    print("[ ! ] Following " + config.dataset_file + ", press Ctrl+C to stop.")
+    try:
+        while True:
+            written = update(config, state_path)
+            if written:
+                print("[ ! ] " + str(written) + " new rows written.")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("[ ! ] Stopped following " + config.dataset_file + ".")
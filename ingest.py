@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+FLOAT32_EXACT_LIMIT = 2 ** 24  # integers above this are rounded in float32
+EPOCH = pd.Timestamp("1970-01-01", tz="UTC")
+
+
+def strip_numeric(series):
+    """
+    Converts a column to floats, removing any square brackets around the values first.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(np.float64)
+    cleaned = series.astype(str).str.replace("[", "", regex=False).str.replace("]", "", regex=False)
+    return pd.to_numeric(cleaned).astype(np.float64)
+
+
+def parse_times(series):
+    """
+    Converts ISO 8601 UTC timestamps to integer unix epochs (whole seconds).
+    Values that are not timestamps are converted with strip_numeric instead.
+    """
+    times = pd.to_datetime(series, format=TIME_FORMAT, utc=True, errors="coerce")
+    invalid = times.isna().to_numpy()
+    seconds = ((times - EPOCH) // pd.Timedelta(seconds=1)).to_numpy()
+
+    if not invalid.any():
+        return seconds.astype(np.int64)
+
+    print(f"[ X ] Error converting {np.count_nonzero(invalid)} time values. Please check the format.")
+    values = seconds.astype(np.float64)
+    values[invalid] = strip_numeric(series[invalid]).to_numpy()
+    return values
+
+
+def parse_column(series, column_name):
+    """
+    Converts one raw CSV column to a NumPy array the same way for every caller.
+    """
+    if column_name == "time":
+        return parse_times(series)
+    return strip_numeric(series).to_numpy()
+
+
+def as_dtype(values, column_name, dtype=None):
+    """
+    Casts parsed values to dtype (kept as parsed when None), warning when float32 cannot hold them exactly.
+    """
+    if dtype is None or values.dtype == dtype:
+        return values
+    if np.dtype(dtype) == np.float32 and len(values) and np.nanmax(np.abs(values)) > FLOAT32_EXACT_LIMIT:
+        print(f"[ X ] {column_name} has values above {FLOAT32_EXACT_LIMIT}, they lose precision as float32.")
+    return values.astype(dtype)
+
+
+def read_column(path, column_name, nrows=None, dtype=None):
+    """
+    Reads and converts a single column of a CSV file, cast to dtype when given (e.g. float32 for large runs).
+    Only column_name is parsed, and when nrows is given the reader stops after that many rows. The pyarrow engine
+    is used for full reads when it is installed (it cannot stop early, so limited reads use the C engine).
+    """
+    engine = "pyarrow" if PYARROW_AVAILABLE and nrows is None else "c"
+    dataset_obj = pd.read_csv(path, usecols=[column_name], nrows=nrows, engine=engine)
+    return as_dtype(parse_column(dataset_obj[column_name], column_name), column_name, dtype)
+
+
+def read_columns(path, column_names, nrows=None, dtype=np.float64):
+    """
+    Reads and converts several columns of a CSV file in one pass into a 2-D float array of dtype, one column per name.
+    """
+    engine = "pyarrow" if PYARROW_AVAILABLE and nrows is None else "c"
+    dataset_obj = pd.read_csv(path, usecols=list(column_names), nrows=nrows, engine=engine)
+
+    values = np.empty((len(dataset_obj), len(column_names)), dtype=dtype)
+    for index, column_name in enumerate(column_names):
+        values[:, index] = as_dtype(parse_column(dataset_obj[column_name], column_name), column_name, dtype)
+    return values
@@ -0,0 +1,74 @@
+import time
+import threading
+import functools
+from contextlib import contextmanager
+
+# stage name -> {"calls", "seconds"}, counter name -> total
+_timings = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def stage(name):
+    """
+    Times the enclosed block and adds it to the totals of stage name.
+    Nested stages are timed separately, so an outer stage includes the time of its inner ones.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            totals = _timings.setdefault(name, {"calls": 0, "seconds": 0.0})
+            totals["calls"] += 1
+            totals["seconds"] += elapsed
+
+
+def timed(name):
+    """
+    Decorator form of stage().
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, amount=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def reset():
+    with _lock:
+        _timings.clear()
+        _counters.clear()
+
+
+def snapshot():
+    """
+    Returns copies of the stage timings and counters collected since the last reset().
+    """
+    with _lock:
+        return {name: dict(totals) for name, totals in _timings.items()}, dict(_counters)
+
+
+def print_report():
+    """
+    Prints the per-stage breakdown, slowest stage first, followed by the counters.
+    """
+    timings, counters = snapshot()
+    if not timings and not counters:
+        return
+
+    print("[ ! ] Stage timings:")
+    width = max([len(name) for name in timings] + [5])
+    for name, totals in sorted(timings.items(), key=lambda item: item[1]["seconds"], reverse=True):
+        print(f"      {name:<{width}}  {totals['seconds'] * 1000:10.1f} ms  {totals['calls']:6d} calls")
+    for name, total in sorted(counters.items()):
+        print(f"      {name:<{width}}  {total}")
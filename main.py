@@ -1,33 +1,27 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from tqdm import tqdm
-import statistics
-from datetime import datetime
 import os
-from entropy_methods import *
-import math
+import sys
+import argparse
+import cProfile
+import pstats
+import incremental
 from dataset_compare import compare_datasets
+from config import read_config
+from entropy_client import get_default_client
+from runner import DTYPES, RunConfig, run, client_for
+from entropy_sources import SOURCES, available_sources
+from reporting import plot_run
+from output_writer import OUTPUT_FORMATS, write_results
+from instrumentation import stage, reset, print_report
+from entropy_metrics import print_entropy_metrics
 
 #! IMPORTANT: Create a config.txt file containing your API keys with the same variable names.
 
 #! TODO: Implement some kind of correlation detection and attempt to adjust the standard deviation range dynamically for each row.
 
-def read_config(value):
-    """
-    Reads the config.txt file for the API keys required to operate the endpoints.
-    """
-    filename="config.txt"
-    with open(filename, "r") as file:
-        for line in file:
-            if line.startswith(value):
-                return line.strip().split("=", 1)[1]
-    print("[ X ] Could not find a valid value in configuration file. Are you sure that you created the config.txt file and populated it?")
-    return None 
-
 # load config
 DATASET_FILE = "forecast.csv"
 COLUMN_NAME = "time" # you may need to rename column unix_time to time in the csv file
+COLUMN_NAMES = None # e.g. ["time", "depth", "mag"] to process several columns together into one wide table
 RANDOM_API_KEY = read_config("RANDOM_API_KEY")
 QUANTUM_API_KEY = read_config("QUANTUM_API_KEY")
 
@@ -40,331 +34,356 @@ standard_deviation_range = 10 # WARNING: first x values will be removed
 AUTO_CORRELATION = True
 CORRELATION_MULTIPLIER = 2
 CORRELATION_SCALE = 100
-SHOW_CORRELATION_GRAPH = False
-DEVIATION_METHOD = "bayesian" # options: std, mad, iqr, bayesian
+AUTO_CORRELATION_ROLLING = False # overlapping profile with one value per row instead of one per block
+DEVIATION_METHOD = "bayesian" # options: std, mad, iqr, bayesian, spectral
 
-#! do not modify these values
-method = "" # leave as blank
+# also compute the rolling spectral entropy of every row, saved and charted with the results
+SPECTRAL_PROFILE = False
 
-def main():
-    print("Dataset Entropy Tool")
-    print("Alexander Walford 2025")
-    print("\n")
-    print("Please select an option from below:\n")
-    print("1) Load and generate new dataset.")
-    print("2) Exit application.")
-    usr_in = input()
-    if usr_in == "1":
-        load_csv()
-    elif usr_in == "2":
-        return
-    else:
-        print("[ X ] Invalid value, try again.")
-        input()
-        main()
+# record remote entropy to disk, or replay a previous recording without any network access
+ENTROPY_STORE_MODE = "off" # options: off, record, replay
+ENTROPY_STORE_PATH = "output/entropy_store"
+ENTROPY_STORE_MAX_BYTES = 256 * 1024 * 1024
+
+# retries of a failed random.org or ANU request (with exponential backoff), and whether local uniform noise is
+# substituted once they are exhausted, False stops the run with the error instead
+REMOTE_RETRIES = 3
+REMOTE_BACKOFF = 0.5
+REMOTE_FALLBACK = True
+
+# process the dataset in chunks with constant memory (no graphs or dataset comparison)
+STREAMING = False
+STREAM_CHUNK_SIZE = 100_000
+
+# only process the rows appended to the dataset since the last run, carrying the state over in output/incremental_state.json
+INCREMENTAL = False
+
+# formats to save the results in, any of csv, npy (memory-mappable) and parquet (needs pyarrow)
+OUTPUT_FORMATS_ENABLED = ["csv"]
+
+# save the charts of every run to the output folder, disable for large batch runs
+PLOTS = True
+
+# measure the Shannon, permutation, sample and approximate entropy of the original, generated and difference values
+ENTROPY_METRICS = True
+
+# print the full original, generated and difference arrays (slow for large datasets)
+PRINT_ARRAYS = False
 
+# float32 halves the memory of large runs at the cost of precision (time epochs lose their seconds), options: float64, float32
+DTYPE = "float64"
 
-def correlation_sign(lst):
-    lst = np.array(lst, dtype=np.float64)
-    lst = (lst - np.mean(lst)) / np.std(lst)  # standardise to mean=0, std=1
-    corr = np.corrcoef(lst, np.arange(len(lst)))[0, 1]
-    if np.isnan(corr):
-        return 0  # handle NaN case
-    return corr * CORRELATION_SCALE  # scale
+# profile every run and print a per-stage timing breakdown, options: None, cprofile, pyinstrument
+PROFILE = None
+PROFILE_TOP_CALLS = 25
 
-def auto_correlation(vals):
+# seed for the local Gaussian noise and seedable sources (pcg64), None for a fresh run every time
+GAUSSIAN_SEED = None
+
+
+# --method names of the built-in methods, registered sources are passed by their own name
+CLI_METHODS = {"atmospheric": "Atmospheric", "gaussian": "Gaussian", "quantum": "Quantum", "atmospheric-quantum": "Atmospheric Quantum"}
+
+
+def config_from_globals(method):
     """
-    Create a scaled automatic correlation array for the dataset for profiling the trend required.
+    Builds the RunConfig for the interactive menu from the settings at the top of this file.
     """
-    print("[ ! ] Using automatic correlation profiling..")
-    lc_cor = 0
-    auto_correlation_array = []
-
-    for i in range(len(vals)):  # use index-based iteration
-        if lc_cor == standard_deviation_range - 1:
-            # ensure there are enough values to take the last x
-            start_idx = max(0, i - (standard_deviation_range - 1))  # avoid negative index
-            last_x_vals = vals[start_idx : i + 1]  # extract last x elements
-
-            if len(last_x_vals) < 2:  # correlation needs at least 2 points
-                print("[ ! ] Warning: Not enough values for correlation. Skipping.")
-                continue
-
-            # compute correlation
-            correlation_profile = correlation_sign(last_x_vals)  
-            
-            # check for NaN
-            if math.isnan(correlation_profile):
-                print("[ ! ] Warning: correlation_profile is NaN. Skipping this entry.")
-            else:
-                auto_correlation_array.append(int(correlation_profile * CORRELATION_MULTIPLIER))
-            
-            lc_cor = 0  # reset counter
-        else:
-            lc_cor += 1
-
-    print("[ ! ] Automatic correlation array:")
-    print(auto_correlation_array)
-
-    return auto_correlation_array
-
-def api_random_method(vals, method):
-    global standard_deviation_range
-    new_vals = []
-    auto_correlation_array = []
-    lc = 0
-
-    if AUTO_CORRELATION:
-        auto_correlation_array = auto_correlation(vals)
-        # render a line chart
-        plt.figure(figsize=(10, 5)) # set the figure size
-        plt.plot(auto_correlation_array, label="Value")
-        plt.title("Dataset Correlation Profile")
-        plt.xlabel('Iteration (sequential time)')
-        plt.ylabel('Correlation Amount')
-        plt.legend()
-        plt.grid(True)
-        plt.savefig('output/correlation.png')
-        if SHOW_CORRELATION_GRAPH:
-            plt.show()
-        else:
-            plt.close()
-
-    for i in tqdm(vals, total=len(vals), desc="Generating new values using " + method + " noise"):
-        if lc > standard_deviation_range - 1: # problem is that first 10 values are not being generated as 10 values are required for standard deviation
-            # get next x values
-            standard_deviation_range_values_p = []
-            lc_n = 0
-            for k in vals:
-                if lc_n > lc and lc_n < lc + standard_deviation_range:
-                    if AUTO_CORRELATION:
-                        standard_deviation_range_values_p.append(float(k + auto_correlation_array[int(lc_n / 10)]))
-                    else:
-                        standard_deviation_range_values_p.append(float(k))
-                lc_n += 1
-
-            # compute standard deviation (only if we have enough values)
-            if len(standard_deviation_range_values_p) > 1:
-                if DEVIATION_METHOD == "std":
-                    upper_range_value = statistics.stdev([float(x) for x in standard_deviation_range_values_p])
-                elif DEVIATION_METHOD == "mad":
-                    upper_range_value = mad_based_std([float(x) for x in standard_deviation_range_values_p])
-                elif DEVIATION_METHOD == "iqr":
-                    upper_range_value = iqr_based_std([float(x) for x in standard_deviation_range_values_p])
-                elif DEVIATION_METHOD == "bayesian":
-                    upper_range_value = bayesian_std([float(x) for x in standard_deviation_range_values_p])
-                else:
-                    ## fallback to std
-                    print(["[ X ] Invalid standard deviation method. Using fallback method."])
-                    upper_range_value = statistics.stdev([float(x) for x in standard_deviation_range_values_p])
-            else:
-                upper_range_value = 0
-
-            # get previous 10 values
-            standard_deviation_range_values_n = []
-            lc_n = 0
-            for k in vals:
-                if lc_n < lc and lc_n > lc - standard_deviation_range:
-                    if AUTO_CORRELATION:
-                        standard_deviation_range_values_n.append(float(k + auto_correlation_array[int(lc_n / 10)]))
-                    else:
-                        standard_deviation_range_values_n.append(float(k))
-                lc_n += 1
-
-            # compute standard deviation (only if we have enough values)
-            if len(standard_deviation_range_values_n) > 1:
-                if DEVIATION_METHOD == "std":
-                    lower_range_value = statistics.stdev([float(x) for x in standard_deviation_range_values_n])
-                elif DEVIATION_METHOD == "mad":
-                    lower_range_value = mad_based_std([float(x) for x in standard_deviation_range_values_n])
-                elif DEVIATION_METHOD == "iqr":
-                    lower_range_value = iqr_based_std([float(x) for x in standard_deviation_range_values_n])
-                elif DEVIATION_METHOD == "bayesian":
-                    lower_range_value = bayesian_std([float(x) for x in standard_deviation_range_values_n])
-                else:
-                    ## fall back to std
-                    lower_range_value = statistics.stdev([float(x) for x in standard_deviation_range_values_n])
-            else:
-                lower_range_value = 0
-
-            # fetch atmospheric noise and store result
-            if method == "Atmospheric":
-                new_row = int(fetch_atmospheric_noise(1, lower_range_value, upper_range_value, RANDOM_API_KEY))
-                new_vals.append(new_row)
-            elif method == "Quantum":
-                new_row = int(fetch_quantum_entropy(1, lower_range_value, upper_range_value, QUANTUM_API_KEY))
-                new_vals.append(new_row)
-        else:
-            # add blank value, first x will be removed anyway
-            new_vals.append(0)
-
-        lc += 1
-    return new_vals
-
-
-def gaussian_noise_method(vals):
-    new_vals = []
-    lc = 0
-
-    for i in tqdm(vals, total=len(vals), desc="Generating new values with Gaussian Noise"):
-        if lc > standard_deviation_range - 1:
-            # get the previous x values for calculating mean and standard deviation
-            standard_deviation_range_values_n = [float(k) for k in vals[max(0, lc - standard_deviation_range):lc]]
-            
-            if len(standard_deviation_range_values_n) > 1:
-                mean_value = np.mean(standard_deviation_range_values_n)
-                stddev_value = np.std(standard_deviation_range_values_n)
-            else:
-                mean_value = 0
-                stddev_value = 1  # default standard deviation if not enough data
-            
-            # generate Gaussian noise based on the computed mean and stddev
-            new_row = fetch_gaussian_noise(1, mean_value, stddev_value)
-            new_vals.append(new_row[0])
+    return RunConfig(
+        dataset_file=DATASET_FILE,
+        column_name=COLUMN_NAME,
+        column_names=COLUMN_NAMES,
+        method=method,
+        only_use=ONLY_USE if ONLY_USE_ENABLED else None,
+        dtype=DTYPE,
+        standard_deviation_range=standard_deviation_range,
+        deviation_method=DEVIATION_METHOD,
+        spectral_profile=SPECTRAL_PROFILE,
+        auto_correlation=AUTO_CORRELATION,
+        correlation_multiplier=CORRELATION_MULTIPLIER,
+        correlation_scale=CORRELATION_SCALE,
+        auto_correlation_rolling=AUTO_CORRELATION_ROLLING,
+        seed=GAUSSIAN_SEED,
+        RANDOM_API_KEY=RANDOM_API_KEY,
+        QUANTUM_API_KEY=QUANTUM_API_KEY,
+        entropy_store_mode=ENTROPY_STORE_MODE,
+        entropy_store_path=ENTROPY_STORE_PATH,
+        entropy_store_max_bytes=ENTROPY_STORE_MAX_BYTES,
+        retries=REMOTE_RETRIES,
+        backoff=REMOTE_BACKOFF,
+        fallback=REMOTE_FALLBACK,
+        streaming=STREAMING,
+        stream_chunk_size=STREAM_CHUNK_SIZE,
+        output_formats=tuple(OUTPUT_FORMATS_ENABLED),
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Dataset Entropy Tool - generate and compare a noise dataset without any prompts.")
+    parser.add_argument("--dataset", default=DATASET_FILE, help="CSV file to load (default: %(default)s)")
+    parser.add_argument("--column", default=COLUMN_NAME, help="column to process (default: %(default)s)")
+    parser.add_argument("--columns", default=",".join(COLUMN_NAMES) if COLUMN_NAMES else None, help="comma separated columns to process together into one wide table, overriding --column")
+    parser.add_argument("--method", required=True, choices=list(CLI_METHODS) + available_sources("uniform"), help="method of entropy, a built-in one or a registered source")
+    parser.add_argument("--only-use", type=int, default=ONLY_USE if ONLY_USE_ENABLED else None, help="only use the first N rows (default: %(default)s)")
+    parser.add_argument("--all-rows", action="store_true", help="use the whole dataset, overriding --only-use")
+    parser.add_argument("--dtype", default=DTYPE, choices=DTYPES, help="float type of the values, float32 halves the memory (default: %(default)s)")
+    parser.add_argument("--window", type=int, default=standard_deviation_range, help="standard deviation range, the first x values are removed (default: %(default)s)")
+    parser.add_argument("--deviation-method", default=DEVIATION_METHOD, choices=["std", "mad", "iqr", "bayesian", "spectral"], help="(default: %(default)s)")
+    parser.add_argument("--spectral-profile", action="store_true", default=SPECTRAL_PROFILE, help="also compute the rolling spectral entropy of every row")
+    parser.add_argument("--auto-correlation", action=argparse.BooleanOptionalAction, default=AUTO_CORRELATION, help="apply the correlation profile (default: %(default)s)")
+    parser.add_argument("--rolling-correlation", action="store_true", default=AUTO_CORRELATION_ROLLING, help="use the overlapping correlation profile")
+    parser.add_argument("--correlation-scale", type=int, default=CORRELATION_SCALE, help="(default: %(default)s)")
+    parser.add_argument("--correlation-multiplier", type=int, default=CORRELATION_MULTIPLIER, help="(default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=GAUSSIAN_SEED, help="seed for the local Gaussian noise and seedable sources (pcg64)")
+    parser.add_argument("--entropy-store", default=ENTROPY_STORE_MODE, choices=["off", "record", "replay"], help="record or replay remote entropy (default: %(default)s)")
+    parser.add_argument("--entropy-store-path", default=ENTROPY_STORE_PATH, help="(default: %(default)s)")
+    parser.add_argument("--retries", type=int, default=REMOTE_RETRIES, help="retries of a failed random.org or ANU request (default: %(default)s)")
+    parser.add_argument("--backoff", type=float, default=REMOTE_BACKOFF, help="backoff factor of the retries in seconds (default: %(default)s)")
+    parser.add_argument("--fallback", action=argparse.BooleanOptionalAction, default=REMOTE_FALLBACK, help="use local uniform noise when a remote source fails, --no-fallback stops with the error (default: %(default)s)")
+    parser.add_argument("--stream", action="store_true", default=STREAMING, help="process the dataset in chunks with constant memory")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE, help="rows per chunk in streaming mode (default: %(default)s)")
+    parser.add_argument("--incremental", action="store_true", default=INCREMENTAL, help="only process the rows appended since the last incremental run")
+    parser.add_argument("--follow", nargs="?", type=float, const=5.0, metavar="SECONDS", help="keep processing appended rows every SECONDS (default: 5) until Ctrl+C")
+    parser.add_argument("--state-file", help="state of the incremental run (default: OUTPUT_DIR/" + incremental.STATE_FILE + ")")
+    parser.add_argument("--output-dir", default="output", help="(default: %(default)s)")
+    parser.add_argument("--output-format", action="append", choices=OUTPUT_FORMATS, help="format to save the results in, may be repeated (default: " + ", ".join(OUTPUT_FORMATS_ENABLED) + ")")
+    parser.add_argument("--no-plots", dest="plots", action="store_false", default=PLOTS, help="do not render any charts")
+    parser.add_argument("--entropy-metrics", action=argparse.BooleanOptionalAction, default=ENTROPY_METRICS, help="measure the entropy of the original, generated and difference values (default: %(default)s)")
+    parser.add_argument("--print-arrays", action="store_true", default=PRINT_ARRAYS, help="print the original, generated and difference arrays")
+    parser.add_argument("--profile", nargs="?", const="cprofile", default=PROFILE, choices=["cprofile", "pyinstrument"], help="print a per-stage timing breakdown and profile the run (default profiler: cprofile)")
+    parser.add_argument("--config-file", default="config.txt", help="file holding the API keys (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def config_from_args(args):
+    method = CLI_METHODS.get(args.method, args.method)
+
+    random_api_key = None
+    quantum_api_key = None
+    if "Atmospheric" in method or method == "random.org":
+        random_api_key = read_config("RANDOM_API_KEY", args.config_file)
+    if "Quantum" in method or method == "anu":
+        quantum_api_key = read_config("QUANTUM_API_KEY", args.config_file)
+
+    return RunConfig(
+        dataset_file=args.dataset,
+        column_name=args.column,
+        column_names=args.columns.split(",") if args.columns else None,
+        method=method,
+        only_use=None if args.all_rows else args.only_use,
+        dtype=args.dtype,
+        standard_deviation_range=args.window,
+        deviation_method=args.deviation_method,
+        spectral_profile=args.spectral_profile,
+        auto_correlation=args.auto_correlation,
+        correlation_multiplier=args.correlation_multiplier,
+        correlation_scale=args.correlation_scale,
+        auto_correlation_rolling=args.rolling_correlation,
+        seed=args.seed,
+        RANDOM_API_KEY=random_api_key,
+        QUANTUM_API_KEY=quantum_api_key,
+        entropy_store_mode=args.entropy_store,
+        entropy_store_path=args.entropy_store_path,
+        retries=args.retries,
+        backoff=args.backoff,
+        fallback=args.fallback,
+        streaming=args.stream,
+        stream_chunk_size=args.chunk_size,
+        output_dir=args.output_dir,
+        output_formats=tuple(args.output_format or OUTPUT_FORMATS_ENABLED),
+    )
+
+
+def cli(argv=None):
+    """
+    Non-interactive entry point, e.g. python main.py --method gaussian --dataset 2024-02-11__2024-04-08.csv
+    """
+    args = parse_args(argv)
+    config = config_from_args(args)
+
+    def run_and_report():
+        if args.follow is not None or args.incremental:
+            # one client for every update, so its summary covers the whole session
+            config.client = client_for(config)
+        if args.follow is not None:
+            incremental.follow(config, args.state_file, args.follow)
+        elif args.incremental:
+            print("[ ! ] " + str(incremental.update(config, args.state_file)) + " new rows written to " + config.output_dir + ".")
         else:
-            # add blank value, first x will be removed anyway
-            new_vals.append(0)
+            return report(run(config), args.plots, args.print_arrays, args.entropy_metrics)
+        (config.client or get_default_client()).print_summary()
 
-        lc += 1
+    if args.profile:
+        return profiled(run_and_report, args.profile, config.output_dir)
+    return run_and_report()
 
-    return new_vals
 
-def load_csv():
-    dataset_obj = pd.read_csv(DATASET_FILE)
-    vals = []
-    dt_size = len(dataset_obj)
-
-    print("Dataset size: " + str(dataset_obj.size))
-
-    lc = 0
-    for _, row in tqdm(dataset_obj.iterrows(), total=dt_size, desc="Processing rows"):
-        if ONLY_USE_ENABLED and lc < ONLY_USE or ONLY_USE_ENABLED == False:
-            # check if needs to be specifically converted
-            if COLUMN_NAME == "time":
-                try:
-                    datetime_obj = datetime.strptime(row[COLUMN_NAME], "%Y-%m-%dT%H:%M:%S.%fZ")
-                    timestamp = int(datetime_obj.timestamp())
-                    vals.append(timestamp)
-                except ValueError:
-                    vals.append(float(row[COLUMN_NAME].replace("[", "").replace("]", ""))) 
-                    print("[ X ] Error converting time value. Please check the format.")
-            else:
-                vals.append(float(row[COLUMN_NAME].replace("[", "").replace("]", ""))) 
-            lc = lc + 1
+def main():
+    while True:
+        print("Dataset Entropy Tool")
+        print("Alexander Walford 2025")
+        print("\n")
+        print("Please select an option from below:\n")
+        print("1) Load and generate new dataset.")
+        print("2) Exit application.")
+        usr_in = input()
+        if usr_in == "1":
+            load_csv()
+            return
+        elif usr_in == "2":
+            return
+        else:
+            print("[ X ] Invalid value, try again.")
+            input()
+
 
+def select_method():
+    """
+    Asks for the method of entropy, returning its name or None for an invalid choice.
+    Every uniform source of the entropy source registry is listed after the built-in methods.
+    """
     print("\n\nPlease select your method of entropy:")
     print("1) Atmospheric Noise (API)")
     print("2) Gaussian Noise (local)")
     print("3) Quantum Noise (API)")
     print("4) Atmospheric & Quantum (API)") # double pass
+
+    methods = {"1": "Atmospheric", "2": "Gaussian", "3": "Quantum", "4": "Atmospheric Quantum"}
+    for name in available_sources("uniform"):
+        methods[str(len(methods) + 1)] = name
+        print(str(len(methods)) + ") " + SOURCES[name].description)
     print("\n> ")
 
-    method = input()
-    new_vals = None
-
-    if method == "1":
-        # call the relevant method
-        method = "Atmospheric"
-        new_vals = api_random_method(vals, method)
-    elif method == "2":
-        method = "Gaussian"
-        new_vals = gaussian_noise_method(vals)
-    elif method == "3":
-        method = "Quantum"
-        new_vals = api_random_method(vals, method)
-    elif method == "4":
-        method = "Atmospheric"
-        new_vals = api_random_method(vals, method)
-        method = "Quantum"
-        new_vals2 = api_random_method(vals, method)
-        method = "Atmospheric Quantum"
-    else:
+    return methods.get(input())
+
+
+def load_csv():
+    method = select_method()
+    while method is None:
         print("[ X ] Invalid value.")
         input()
-        load_csv()
-
-    # now remove first x values that cannot be compared
-    vals = vals[standard_deviation_range:]
-    new_vals = new_vals[standard_deviation_range:]
-
-    # print arrays
-    print("Original values (" + str(len(new_vals)) + "):")
-    print(vals)
-
-    print("New values (" + str(len(new_vals)) + "):")
-    print(new_vals)
-
-    # now convert the new_vals into a dataframe
-    new_vals_df = pd.DataFrame(new_vals)
-
-    # check if output folder exists, if it doesn't then create it!
-    if os.path.exists("output") == False:
-        os.makedirs("output")
-
-    # save into new csv
-    new_vals_df.to_csv("output/random_values.csv", index=False)
-
-    # compare original vals and new vals and generate a difference array
-    comparison_array = []
-    lc = 0
-    for old_val in vals:
-        if lc < len(new_vals):            
-            if method == "Atmospheric Quantum":
-                comparison_array.append(float(old_val) - float(new_vals[lc]) - float(new_vals2[lc]))
-            else:
-                comparison_array.append(float(old_val) - float(new_vals[lc]))
-        else:
-            print("[ X ] Invalid length, new and old do not match.")
-            comparison_array.append(float(old_val))
-        lc += 1
-
-    print(comparison_array)
-
-    # convert the comparisons array into a dataframe
-    comparison_array_df = pd.DataFrame(comparison_array)
-
-    # save into a new csv
-    comparison_array_df.to_csv("output/comparisons.csv", index=False)
-
-    # normalize vals
-    vals_min = min(vals)
-    vals_max = max(vals)
-    normalized_vals = [(x - vals_min) / (vals_max - vals_min) for x in vals]
-
-    # normalize new_vals
-    new_vals_min = min(new_vals)
-    new_vals_max = max(new_vals)
-    normalized_new_vals = [(x - new_vals_min) / (new_vals_max - new_vals_min) for x in new_vals]
-
-    # render a line chart containing the original and new values using matplotlib
-    plt.plot(normalized_vals, label="Original Values")
-    plt.plot(normalized_new_vals, label="New Random Values")
-    plt.title(COLUMN_NAME.title() + " Dataset Entropy Filtering - " + method + " Noise Method")
-    plt.xlabel('Iteration (sequential time)')
-    plt.ylabel(COLUMN_NAME)
-    plt.grid(True)
-    plt.legend()
-    plt.savefig('output/new_old_rnd.png')
-    plt.show()
-
-    # render a line chart illustrating just the differences
-    plt.figure(figsize=(10, 5)) # set the figure size
-    plt.plot(comparison_array, label="Difference")
-    plt.title(COLUMN_NAME.title() + " Dataset Entropy Filtering (difference) - " + method + " Noise Method")
-    plt.axhline(y=np.mean(comparison_array), color='red', linestyle='--', linewidth=2, label="Average")
-    plt.axhline(y=0, color='green', linestyle='-', linewidth=2, label="Target")
-    plt.xlabel('Iteration (sequential time)')
-    plt.ylabel("Random, " + DEVIATION_METHOD.upper() + " RND Gen. Val")
-    plt.legend()
-    plt.grid(True)
-    plt.savefig('output/diff_vals.png')
-    plt.show()
+        method = select_method()
+
+    run_and_report = lambda: report(run(config_from_globals(method)))
+    if PROFILE:
+        profiled(run_and_report, PROFILE)
+    else:
+        run_and_report()
+
+
+def report(result, plots=PLOTS, print_arrays=PRINT_ARRAYS, entropy_metrics=ENTROPY_METRICS):
+    """
+    Prints, saves and plots the result of a run, then compares the original and new values and returns the
+    ComparisonResult (a dict of them per column for multi-column runs, None in streaming mode). With plots False no charts are rendered (and matplotlib is never imported).
+    The arrays themselves are only printed with print_arrays, and entropy_metrics also prints how much entropy the
+    original, generated and difference values hold.
+    """
+    config = result.config
+    method = config.method
+
+    # report how the remote entropy sources behaved
+    (result.client or get_default_client()).print_summary()
+
+    if config.streaming:
+        if list(config.output_formats) != ["csv"]:
+            print("[ ! ] Streaming mode only writes csv output.")
+        print("[ ! ] Done. " + str(result.rows) + " rows written to " + config.output_dir + "/random_values.csv and " + config.output_dir + "/comparisons.csv.")
+        return
+
+    vals = result.original
+    new_vals = result.generated
+    comparison_array = result.difference
+
+    if print_arrays:
+        print("Original values (" + str(len(new_vals)) + "):")
+        print(vals)
+
+        print("New values (" + str(len(new_vals)) + "):")
+        print(new_vals)
+
+        print(comparison_array)
+
+        if config.auto_correlation and method != "Gaussian":
+            print("[ ! ] Automatic correlation array:")
+            print(result.correlation_profile)
+
+        if result.spectral_entropy is not None:
+            print("[ ! ] Spectral entropy profile:")
+            print(result.spectral_entropy)
+    else:
+        print("[ ! ] Generated " + str(new_vals.size) + " values.")
+
+    with stage("write output"):
+        write_results(result, config.output_dir, config.output_formats)
+
+    if vals.ndim == 2:
+        # multi-column runs are compared column by column, without charts
+        print("[ ! ] Done.")
+        print("[ ! ] Comparing datasets..")
+        comparisons = {}
+        with stage("compare"):
+            for index, column_name in enumerate(config.column_names):
+                print("[ ! ] " + column_name + ":")
+                comparisons[column_name] = compare_datasets(original=vals[:, index], new=new_vals[:, index], plots=False)
+                if entropy_metrics:
+                    print_entropy_metrics([("original", vals[:, index]), ("generated", new_vals[:, index]), ("difference", comparison_array[:, index])])
+        return comparisons
+
+    if plots:
+        with stage("plots"):
+            plot_run(result, config.output_dir)
 
     print("[ ! ] Done.")
 
-    compare_datasets("0", COLUMN_NAME)
     print("[ ! ] Comparing datasets..")
+    with stage("compare"):
+        comparison = compare_datasets(original=vals, new=new_vals, plots=plots, output_dir=config.output_dir)
+        if entropy_metrics:
+            print_entropy_metrics([("original", vals), ("generated", new_vals), ("difference", comparison_array)])
+    return comparison
+
+
+def profiled(function, profiler="cprofile", output_dir="output"):
+    """
+    Calls function under cProfile (or pyinstrument when installed and asked for), printing the slowest calls and
+    saving the full profile to output_dir. The per-stage timings are printed either way.
+    """
+    reset()
+    if os.path.exists(output_dir) == False:
+        os.makedirs(output_dir)
+
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("[ X ] pyinstrument is not installed, using cProfile instead.")
+            profiler = "cprofile"
+
+    if profiler == "pyinstrument":
+        profile = Profiler()
+        profile.start()
+        try:
+            return function()
+        finally:
+            profile.stop()
+            print(profile.output_text(unicode=True, color=False))
+            with open(os.path.join(output_dir, "profile.html"), "w") as file:
+                file.write(profile.output_html())
+            print_report()
+
+    profile = cProfile.Profile()
+    try:
+        return profile.runcall(function)
+    finally:
+        path = os.path.join(output_dir, "profile.prof")
+        profile.dump_stats(path)
+        pstats.Stats(profile).sort_stats("cumulative").print_stats(PROFILE_TOP_CALLS)
+        print("[ ! ] Full profile saved to " + path + " (open it with python -m pstats or snakeviz).")
+        print_report()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        cli()
+    else:
+        main()
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import numpy as np
+import pandas as pd
+from dataclasses import fields
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+OUTPUT_FORMATS = ("csv", "npy", "parquet")
+RESULT_COLUMNS = ("original", "generated", "generated2", "difference", "spectral_entropy")
+METADATA_FILE = "metadata.json"
+PARQUET_FILE = "results.parquet"
+WIDE_CSV_FILE = "wide_results.csv"
+PARQUET_METADATA_KEY = b"entropy_run"
+PRIVATE_FIELDS = ("client", "RANDOM_API_KEY", "QUANTUM_API_KEY")  # never written to the metadata
+
+
+def run_metadata(result):
+    """
+    Describes a run: its settings (without the client and API keys), row count, dtypes and when it was written.
+    """
+    config = result.config
+    metadata = {field.name: getattr(config, field.name) for field in fields(config) if field.name not in PRIVATE_FIELDS}
+    metadata["rows"] = result.rows
+    metadata["columns"] = {name: str(getattr(result, name).dtype) for name in RESULT_COLUMNS if getattr(result, name) is not None}
+    metadata["written_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return metadata
+
+
+def _result_columns(result):
+    return {name: np.ascontiguousarray(getattr(result, name)) for name in RESULT_COLUMNS if getattr(result, name) is not None}
+
+
+def wide_columns(result):
+    """
+    Flattens the 2-D arrays of a multi-column run into one named column per dataset column and kind,
+    e.g. mag, mag_generated and mag_difference.
+    """
+    table = {}
+    for index, column_name in enumerate(result.config.column_names):
+        for name, values in _result_columns(result).items():
+            table[column_name if name == "original" else column_name + "_" + name] = values[:, index]
+    return table
+
+
+def write_csv(result, output_dir):
+    if result.original.ndim == 2:
+        # multi-column runs are saved as one wide table
+        pd.DataFrame(wide_columns(result)).to_csv(os.path.join(output_dir, WIDE_CSV_FILE), index=False)
+        return
+
+    # the generated values and the differences, as written since the first version
+    pd.DataFrame(result.generated).to_csv(os.path.join(output_dir, "random_values.csv"), index=False)
+    pd.DataFrame(result.difference).to_csv(os.path.join(output_dir, "comparisons.csv"), index=False)
+    if result.spectral_entropy is not None:
+        pd.DataFrame(result.spectral_entropy).to_csv(os.path.join(output_dir, "spectral_entropy.csv"), index=False)
+
+
+def write_npy(result, output_dir, metadata):
+    # one raw .npy file per column, which np.load can memory-map straight back
+    for name, values in _result_columns(result).items():
+        np.save(os.path.join(output_dir, name + ".npy"), values)
+    with open(os.path.join(output_dir, METADATA_FILE), "w") as file:
+        json.dump(metadata, file, indent=2)
+
+
+def write_parquet(result, output_dir, metadata):
+    table = pa.table(wide_columns(result) if result.original.ndim == 2 else _result_columns(result))
+    table = table.replace_schema_metadata({PARQUET_METADATA_KEY: json.dumps(metadata).encode()})
+    # a single row group keeps every column in one chunk, so it can be read back without copying
+    pq.write_table(table, os.path.join(output_dir, PARQUET_FILE), row_group_size=max(len(table), 1))
+
+
+def write_results(result, output_dir="output", formats=("csv",)):
+    """
+    Saves the original values, generated values and differences of a run in each of formats:
+    csv (random_values.csv, comparisons.csv and spectral_entropy.csv when profiled), npy (one .npy per column plus metadata.json) or parquet
+    (results.parquet with the metadata in its schema). parquet needs pyarrow and falls back to npy without it.
+    Multi-column runs are saved as one wide table instead (wide_results.csv, 2-D .npy arrays or a wide Parquet file).
+    """
+    unknown = set(formats) - set(OUTPUT_FORMATS)
+    if unknown:
+        raise ValueError(f"Invalid output format: {', '.join(sorted(unknown))}. Options: {', '.join(OUTPUT_FORMATS)}")
+
+    formats = list(formats)
+    if "parquet" in formats and PYARROW_AVAILABLE == False:
+        print("[ X ] pyarrow is not installed, writing .npy files instead of Parquet.")
+        formats = [f for f in formats if f != "parquet"] + ["npy"]
+
+    # check if output folder exists, if it doesn't then create it!
+    if os.path.exists(output_dir) == False:
+        os.makedirs(output_dir)
+
+    metadata = run_metadata(result)
+    if "csv" in formats:
+        write_csv(result, output_dir)
+    if "npy" in formats:
+        write_npy(result, output_dir, metadata)
+    if "parquet" in formats:
+        write_parquet(result, output_dir, metadata)
+
+
+def read_results(output_dir="output"):
+    """
+    Reads the binary results of a run without copying them: the .npy files are memory-mapped read-only and the
+    Parquet file is memory-mapped through pyarrow. Returns (columns, metadata), columns mapping each saved column
+    name to an array, or None when the folder holds no binary results.
+    """
+    metadata_path = os.path.join(output_dir, METADATA_FILE)
+    if os.path.exists(metadata_path):
+        with open(metadata_path, "r") as file:
+            metadata = json.load(file)
+        columns = {}
+        for name in metadata["columns"]:
+            columns[name] = np.load(os.path.join(output_dir, name + ".npy"), mmap_mode="r")
+        return columns, metadata
+
+    parquet_path = os.path.join(output_dir, PARQUET_FILE)
+    if PYARROW_AVAILABLE and os.path.exists(parquet_path):
+        table = pq.read_table(parquet_path, memory_map=True)
+        metadata = json.loads(table.schema.metadata[PARQUET_METADATA_KEY])
+        columns = {name: table.column(name).to_numpy() for name in table.column_names}
+        return columns, metadata
+
+    return None
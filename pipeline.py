@@ -0,0 +1,117 @@
+import asyncio
+import numpy as np
+from entropy_methods import fetch_atmospheric_noise_batch, fetch_quantum_entropy_batch, QuantumEntropyPool, float_array
+from entropy_sources import EntropySource, GaussianSource, available_sources, create_source, fetch_source_batch
+from sliding_window import deviation_ranges, rolling_mean_std, correlation_profile, correlation_offsets
+from async_fetch import fetch_dual_async
+from instrumentation import stage
+
+METHODS = ("Atmospheric", "Gaussian", "Quantum", "Atmospheric Quantum")
+
+
+def available_methods():
+    """
+    The built-in methods followed by every uniform source of the entropy source registry.
+    """
+    return METHODS + tuple(available_sources("uniform"))
+
+
+def compute_ranges(vals, standard_deviation_range=10, deviation_method="std", correlation=None):
+    """
+    Computes the lower and upper deviation range of every row.
+    correlation is an optional (scale, multiplier, rolling) tuple that applies the automatic correlation profile.
+    Returns (lower_ranges, upper_ranges, profile), the profile being empty when correlation is disabled.
+    """
+    profile = np.zeros(0, dtype=np.int64)
+    offsets = None
+    if correlation is not None:
+        scale, multiplier, rolling = correlation
+        with stage("correlation profile"):
+            profile = correlation_profile(vals, standard_deviation_range, scale, multiplier, rolling)
+            offsets = correlation_offsets(profile, len(vals), standard_deviation_range, rolling)
+
+    with stage("deviation ranges"):
+        lower_ranges, upper_ranges = deviation_ranges(vals, standard_deviation_range, deviation_method, offsets)
+    return lower_ranges, upper_ranges, profile
+
+
+def generate_from_ranges(lower_ranges, upper_ranges, method, standard_deviation_range=10, RANDOM_API_KEY=None, QUANTUM_API_KEY=None, pool=None, client=None, source=None, seed=None):
+    """
+    Fetches one whole-numbered value per row from the remote source(s) of method, through client (the shared
+    default client when None). The first standard_deviation_range rows are left at 0, they are removed before comparing.
+    method may also name a uniform source of the entropy source registry, drawn from source when given (so a stream
+    keeps drawing from the same one) or from a new source created with seed, the API keys and client.
+    Returns (new_vals, new_vals2), new_vals2 holding the Quantum pass of "Atmospheric Quantum" and None otherwise.
+    """
+    w = standard_deviation_range
+    new_vals = np.zeros(np.shape(lower_ranges), dtype=np.int64)
+
+    # 2-D ranges (rows, columns) are fetched as one flat batch and shaped back
+    shape = new_vals[w:].shape
+    min_vals = np.ravel(lower_ranges[w:])
+    max_vals = np.ravel(upper_ranges[w:])
+
+    if method == "Atmospheric":
+        new_vals[w:] = fetch_atmospheric_noise_batch(min_vals, max_vals, RANDOM_API_KEY, client=client).reshape(shape)
+        return new_vals, None
+    if method == "Quantum":
+        if pool is None:
+            pool = QuantumEntropyPool(QUANTUM_API_KEY, client=client)
+        new_vals[w:] = fetch_quantum_entropy_batch(min_vals, max_vals, QUANTUM_API_KEY, pool=pool).reshape(shape)
+        return new_vals, None
+    if method == "Atmospheric Quantum":
+        new_vals2 = np.zeros(np.shape(lower_ranges), dtype=np.int64)
+        atmospheric, quantum = asyncio.run(fetch_dual_async(min_vals, max_vals, RANDOM_API_KEY, QUANTUM_API_KEY, client=client))
+        new_vals[w:] = atmospheric.reshape(shape)
+        new_vals2[w:] = quantum.reshape(shape)
+        return new_vals, new_vals2
+    if method in available_sources("uniform"):
+        if source is None:
+            source = create_source(method, seed=seed, RANDOM_API_KEY=RANDOM_API_KEY, QUANTUM_API_KEY=QUANTUM_API_KEY, client=client)
+        new_vals[w:] = fetch_source_batch(min_vals, max_vals, source).reshape(shape)
+        return new_vals, None
+
+    raise ValueError(f"Invalid method: {method}. Options: {', '.join(available_methods())}")
+
+
+def generate_gaussian(vals, standard_deviation_range=10, seed=None):
+    """
+    Draws one Gaussian value per row from the mean and standard deviation of the previous x values.
+    seed may be a seed, an np.random.Generator or a normal EntropySource. The first standard_deviation_range rows are left at 0.
+    vals may be 2-D (rows, columns). The values are generated in the float dtype of vals (float64 for integers).
+    """
+    source = seed if isinstance(seed, EntropySource) else GaussianSource(seed)
+    vals = float_array(vals)
+    new_vals = np.zeros(vals.shape, dtype=vals.dtype)
+    with stage("rolling mean and std"):
+        mean_values, stddev_values = rolling_mean_std(vals, standard_deviation_range)
+    with stage("fetch " + source.name):
+        # mean + std * noise, built up in place in the rows it is returned in
+        generated = new_vals[standard_deviation_range:]
+        np.multiply(stddev_values, source.fill(mean_values.size).reshape(mean_values.shape), out=generated, casting="same_kind")
+        generated += mean_values
+    return new_vals
+
+
+def generate_values(vals, method, standard_deviation_range=10, deviation_method="std", correlation=None,
+                    RANDOM_API_KEY=None, QUANTUM_API_KEY=None, seed=None, client=None):
+    """
+    Generates one new value per row of vals with method, without any prompts, printing of arrays or graphs.
+    Returns (new_vals, new_vals2) as generate_from_ranges does.
+    """
+    if method == "Gaussian":
+        return generate_gaussian(vals, standard_deviation_range, seed), None
+
+    lower_ranges, upper_ranges, _ = compute_ranges(vals, standard_deviation_range, deviation_method, correlation)
+    return generate_from_ranges(lower_ranges, upper_ranges, method, standard_deviation_range, RANDOM_API_KEY, QUANTUM_API_KEY, client=client, seed=seed)
+
+
+def difference(vals, new_vals, new_vals2=None):
+    """
+    Original values minus the generated value(s) of every row, in the float dtype of vals (float64 for integers).
+    """
+    vals = float_array(vals)
+    comparison_array = np.subtract(vals, new_vals, dtype=vals.dtype)
+    if new_vals2 is not None:
+        np.subtract(comparison_array, new_vals2, out=comparison_array, casting="same_kind")
+    return comparison_array
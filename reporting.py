@@ -0,0 +1,174 @@
+import os
+import numpy as np
+
+FIGSIZE = (10, 5)
+PLOT_DPI = 100
+PLOT_WIDTH_PX = FIGSIZE[0] * PLOT_DPI
+MAX_SCATTER_POINTS = 20_000
+
+_plt = None  # matplotlib.pyplot, only imported once a plot is requested
+
+
+def _pyplot():
+    """
+    Imports matplotlib on first use with the non-interactive Agg backend, so runs without plots never pay for it
+    and plotting never blocks on a window.
+    """
+    global _plt
+    if _plt is None:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        _plt = plt
+    return _plt
+
+
+def normalize(values, out=None):
+    """
+    Scales values to the range 0 to 1 (all zeros for a constant series).
+    The result is written to out when given, which may be values itself to normalize a float array in place.
+    Otherwise a new array is returned, float32 for float32 values and float64 for anything else.
+    """
+    values = np.asarray(values)
+    if out is None:
+        out = np.empty(values.shape, dtype=np.float32 if values.dtype == np.float32 else np.float64)
+    if len(values) == 0:
+        return out
+    low = np.min(values)
+    span = np.max(values) - low
+    if span == 0:
+        out[...] = 0
+        return out
+    np.subtract(values, low, out=out, casting="unsafe")
+    out /= span
+    return out
+
+
+def decimate(values, width=PLOT_WIDTH_PX):
+    """
+    Reduces a series longer than the plot is wide to the minimum and maximum of each of width buckets, which draws
+    the same outline at that width. Returns (x, y), x being the original indices of the kept values.
+    """
+    values = np.asarray(values)
+    n = len(values)
+    if n <= 2 * width:
+        return np.arange(n), values
+
+    bucket = -(-n // width)
+    full = (n // bucket) * bucket
+    blocks = values[:full].reshape(-1, bucket)
+    starts = np.arange(0, full, bucket)
+    index = np.sort(np.stack([starts + np.argmin(blocks, axis=1), starts + np.argmax(blocks, axis=1)], axis=1), axis=1).ravel()
+
+    if full < n:
+        tail = values[full:]
+        index = np.concatenate([index, np.sort([full + np.argmin(tail), full + np.argmax(tail)])])
+    return index, values[index]
+
+
+def thin(x, y, max_points=MAX_SCATTER_POINTS):
+    """
+    Keeps every k-th point of a scatter so that at most max_points are drawn.
+    """
+    step = max(1, -(-len(x) // max_points))
+    return np.asarray(x)[::step], np.asarray(y)[::step]
+
+
+def line_chart(path, series, title, xlabel, ylabel, hlines=(), grid=True):
+    """
+    Saves a line chart of one or more series to path and closes it.
+    series is a list of (values, label, style) tuples, style being a dict of extra plot arguments.
+    hlines is a list of (y, label, style) tuples drawn as horizontal lines.
+    """
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=FIGSIZE)
+    try:
+        for values, label, style in series:
+            x, y = decimate(values)
+            ax.plot(x, y, label=label, **style)
+        for y, label, style in hlines:
+            ax.axhline(y=y, label=label, **style)
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.legend()
+        ax.grid(grid)
+        fig.savefig(path, dpi=PLOT_DPI)
+    finally:
+        plt.close(fig)
+
+
+def scatter_chart(path, x, y, title, xlabel, ylabel):
+    """
+    Saves a scatter plot of y against x with the y=x line of a perfect match to path and closes it.
+    """
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=FIGSIZE)
+    try:
+        low, high = (np.min(x), np.max(x)) if len(x) else (0, 0)
+        x, y = thin(x, y)
+        ax.scatter(x, y, color='orange', label='Data Points')
+        ax.plot([low, high], [low, high], color='blue', linestyle='--', label='Perfect Match (y=x)')
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.legend()
+        ax.grid()
+        fig.savefig(path, dpi=PLOT_DPI)
+    finally:
+        plt.close(fig)
+
+
+def plot_run(result, output_dir="output"):
+    """
+    Saves the correlation profile, spectral entropy profile, original against new values and difference charts of a run.
+    """
+    config = result.config
+    method = config.method
+
+    if config.auto_correlation and method != "Gaussian":
+        line_chart(os.path.join(output_dir, 'correlation.png'), [(result.correlation_profile, "Value", {})],
+                   "Dataset Correlation Profile", 'Iteration (sequential time)', 'Correlation Amount')
+
+    if result.spectral_entropy is not None:
+        line_chart(os.path.join(output_dir, 'spectral_entropy.png'), [(result.spectral_entropy, "Spectral Entropy", {})],
+                   config.column_name.title() + " Rolling Spectral Entropy", 'Iteration (sequential time)', 'Entropy (bits)')
+
+    line_chart(
+        os.path.join(output_dir, 'new_old_rnd.png'),
+        [(normalize(result.original), "Original Values", {}), (normalize(result.generated), "New Random Values", {})],
+        config.column_name.title() + " Dataset Entropy Filtering - " + method + " Noise Method",
+        'Iteration (sequential time)', config.column_name,
+    )
+
+    comparison_array = result.difference
+    line_chart(
+        os.path.join(output_dir, 'diff_vals.png'),
+        [(comparison_array, "Difference", {})],
+        config.column_name.title() + " Dataset Entropy Filtering (difference) - " + method + " Noise Method",
+        'Iteration (sequential time)', "Random, " + config.deviation_method.upper() + " RND Gen. Val",
+        hlines=[
+            (np.mean(comparison_array) if len(comparison_array) else 0, "Average", dict(color='red', linestyle='--', linewidth=2)),
+            (0, "Target", dict(color='green', linestyle='-', linewidth=2)),
+        ],
+    )
+
+
+def plot_comparison(original, new, output_dir="output"):
+    """
+    Saves the four dataset comparison charts, raw and normalized line charts and scatter plots.
+    """
+    normalized_original = normalize(original)
+    normalized_new = normalize(new)
+
+    line_chart(os.path.join(output_dir, 'NORMALIZED_FINAL_dataset_comparison.png'),
+               [(normalized_original, 'Original Dataset', dict(color='blue')), (normalized_new, 'New Dataset', dict(color='red'))],
+               'Comparison of Datasets (NORMALIZED)', 'Index', 'Values')
+    line_chart(os.path.join(output_dir, 'FINAL_dataset_comparison.png'),
+               [(original, 'Original Dataset', dict(color='blue')), (new, 'New Dataset', dict(color='red'))],
+               'Comparison of Datasets', 'Index', 'Values')
+
+    scatter_chart(os.path.join(output_dir, 'NORMALIZED_dataset_diff_scatter.png'), normalized_original, normalized_new,
+                  'Scatter Plot of Original vs New Dataset', 'Original Dataset (NORMALIZED)', 'New Dataset')
+    scatter_chart(os.path.join(output_dir, 'dataset_diff_scatter.png'), original, new,
+                  'Scatter Plot of Original vs New Dataset', 'Original Dataset', 'New Dataset')
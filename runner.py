@@ -0,0 +1,152 @@
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Optional
+from ingest import read_column, read_columns
+from pipeline import available_methods, compute_ranges, generate_from_ranges, generate_gaussian, difference
+from sliding_window import spectral_entropy_profile
+from streaming import StreamProcessor, stream_csv
+from entropy_client import EntropyClient, DEFAULT_RETRIES, DEFAULT_BACKOFF
+from entropy_store import EntropyStore
+from instrumentation import stage, count
+
+DTYPES = ("float64", "float32")
+
+
+@dataclass
+class RunConfig:
+    """
+    Everything a single run needs, replacing the module-level settings and input() prompts of main.py.
+    """
+    dataset_file: str = "forecast.csv"
+    column_name: str = "time"
+    column_names: Optional[list] = None  # several columns processed together instead of column_name
+    method: str = "Gaussian"  # options: Atmospheric, Gaussian, Quantum, Atmospheric Quantum or a registered source
+    only_use: Optional[int] = None  # only use the first rows, None for the whole dataset
+    dtype: str = "float64"  # options: float64, float32 (half the memory for large runs, not used in streaming mode)
+    standard_deviation_range: int = 10
+    deviation_method: str = "bayesian"  # options: std, mad, iqr, bayesian, spectral
+    spectral_profile: bool = False  # also compute the rolling spectral entropy of every row (not in streaming mode)
+    auto_correlation: bool = True
+    correlation_multiplier: int = 2
+    correlation_scale: int = 100
+    auto_correlation_rolling: bool = False
+    seed: Optional[int] = None  # for the Gaussian noise and seedable sources such as pcg64
+    RANDOM_API_KEY: Optional[str] = None
+    QUANTUM_API_KEY: Optional[str] = None
+    entropy_store_mode: str = "off"  # options: off, record, replay
+    entropy_store_path: str = "output/entropy_store"
+    entropy_store_max_bytes: int = 256 * 1024 * 1024
+    retries: int = DEFAULT_RETRIES  # retries of a failed random.org or ANU request, with exponential backoff
+    backoff: float = DEFAULT_BACKOFF  # backoff factor of the retries (seconds)
+    fallback: bool = True  # substitute local uniform noise once the retries are exhausted, False raises instead
+    streaming: bool = False
+    stream_chunk_size: int = 100_000
+    output_dir: str = "output"
+    output_formats: tuple = ("csv",)  # any of csv, npy, parquet (streaming always writes csv)
+    client: Optional[EntropyClient] = None  # the shared default client when None
+
+
+@dataclass
+class RunResult:
+    """
+    Outcome of a run. The first standard_deviation_range rows, which cannot be compared, are already removed.
+    In streaming mode the arrays are not kept in memory and only rows is set. Multi-column runs hold 2-D
+    (rows, columns) arrays in the order of config.column_names.
+    """
+    config: RunConfig
+    rows: int
+    original: Optional[np.ndarray] = None
+    generated: Optional[np.ndarray] = None
+    generated2: Optional[np.ndarray] = None
+    difference: Optional[np.ndarray] = None
+    correlation_profile: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    spectral_entropy: Optional[np.ndarray] = None  # rolling spectral entropy (bits) of every row, with config.spectral_profile
+    client: Optional[EntropyClient] = None
+
+
+def client_for(config):
+    """
+    The client given in config, a new one when the store is enabled or the retries, backoff or fallback differ from
+    the defaults, or None for the shared default client.
+    """
+    if config.client is not None:
+        return config.client
+    store = None
+    if config.entropy_store_mode != "off":
+        store = EntropyStore(config.entropy_store_path, config.entropy_store_mode, config.entropy_store_max_bytes)
+    if store is None and (config.retries, config.backoff, config.fallback) == (DEFAULT_RETRIES, DEFAULT_BACKOFF, True):
+        return None
+    return EntropyClient(retries=config.retries, backoff=config.backoff, fallback=config.fallback, store=store)
+
+
+def run(config):
+    """
+    Runs one generation as described by config and returns its RunResult.
+    Nothing is read from stdin, module globals or the terminal, so any number of runs can be made in one process.
+    """
+    if config.method not in available_methods():
+        raise ValueError(f"Invalid method: {config.method}. Options: {', '.join(available_methods())}")
+    if config.dtype not in DTYPES:
+        raise ValueError(f"Invalid dtype: {config.dtype}. Options: {', '.join(DTYPES)}")
+
+    client = client_for(config)
+    w = config.standard_deviation_range
+    correlation = None
+    if config.auto_correlation:
+        correlation = (config.correlation_scale, config.correlation_multiplier, config.auto_correlation_rolling)
+
+    if config.streaming:
+        if config.column_names:
+            raise ValueError("Streaming mode processes a single column, use column_name instead of column_names.")
+        processor = StreamProcessor(
+            config.method, w, config.deviation_method, config.RANDOM_API_KEY, config.QUANTUM_API_KEY,
+            config.seed, correlation, client,
+        )
+        with stage("stream"):
+            rows = stream_csv(config.dataset_file, config.column_name, processor, config.stream_chunk_size, config.only_use, config.output_dir)
+        return RunResult(config, rows, client=client)
+
+    with stage("read csv"):
+        if config.column_names:
+            # every column is loaded in one pass and processed together down the rows
+            vals = read_columns(config.dataset_file, config.column_names, config.only_use, config.dtype)
+        else:
+            # float64 keeps the parsed dtype (integer epochs for time), float32 casts every column
+            vals = read_column(config.dataset_file, config.column_name, config.only_use, None if config.dtype == "float64" else config.dtype)
+    count("rows read", len(vals))
+
+    spectral = None
+    if config.spectral_profile:
+        with stage("spectral profile"):
+            spectral = spectral_entropy_profile(vals, w)[w:]
+
+    profile = np.zeros(0, dtype=np.int64)
+    new_vals2 = None
+    if config.method == "Gaussian":
+        with stage("generate"):
+            new_vals = generate_gaussian(vals, w, config.seed)
+    else:
+        lower_ranges, upper_ranges, profile = compute_ranges(vals, w, config.deviation_method, correlation)
+        with stage("generate"):
+            new_vals, new_vals2 = generate_from_ranges(
+                lower_ranges, upper_ranges, config.method, w, config.RANDOM_API_KEY, config.QUANTUM_API_KEY,
+                client=client, seed=config.seed,
+            )
+
+    # now remove first x values that cannot be compared
+    original = vals[w:]
+    new_vals = new_vals[w:]
+    if new_vals2 is not None:
+        new_vals2 = new_vals2[w:]
+
+    return RunResult(
+        config,
+        rows=len(original),
+        original=original,
+        generated=new_vals,
+        generated2=new_vals2,
+        difference=difference(original, new_vals, new_vals2),
+        correlation_profile=profile,
+        spectral_entropy=spectral,
+        client=client,
+    )
@@ -0,0 +1,172 @@
+import numpy as np
+import statistics
+from numpy.lib.stride_tricks import sliding_window_view
+from entropy_methods import (
+    float_array, mad_based_std, iqr_based_std, bayesian_std, spectral_entropy_std,
+    std_batch, mad_based_std_batch, iqr_based_std_batch, bayesian_std_batch, spectral_entropy_std_batch,
+    spectral_entropy_rolling, spectral_entropy_std_rolling,
+)
+from instrumentation import stage
+
+
+ESTIMATOR_BLOCK_ROWS = 65_536  # windows estimated at once
+
+WINDOW_ESTIMATORS = {
+    "std": std_batch,
+    "mad": mad_based_std_batch,
+    "iqr": iqr_based_std_batch,
+    "bayesian": bayesian_std_batch,
+    "spectral": spectral_entropy_std_batch,
+}
+
+# estimators that share work between overlapping windows, given the run of values and the window length instead
+SERIES_ESTIMATORS = {
+    "spectral": spectral_entropy_std_rolling,
+}
+
+SCALAR_ESTIMATORS = {
+    "std": statistics.stdev,
+    "mad": mad_based_std,
+    "iqr": iqr_based_std,
+    "bayesian": bayesian_std,
+    "spectral": spectral_entropy_std,
+}
+
+
+def correlation_profile(vals, standard_deviation_range, scale=100, multiplier=2, rolling=False):
+    """
+    Scaled trend correlation (Pearson correlation against the sample index) of every block of
+    standard_deviation_range values, computed for all blocks at once.
+    Blocks are consecutive and non-overlapping by default; with rolling there is one overlapping block ending at
+    every value. Blocks without any spread have no trend and score 0.
+    vals may be 2-D (rows, columns), giving one profile per column.
+    """
+    values = float_array(vals)
+    window = standard_deviation_range
+    if window < 2 or len(values) < window:
+        return np.zeros((0,) + values.shape[1:], dtype=np.int64)
+
+    # blocks run down the rows, each block's values along the last axis
+    if rolling:
+        blocks = sliding_window_view(values, window, axis=0)
+    else:
+        num_blocks = len(values) // window
+        blocks = np.moveaxis(values[:num_blocks * window].reshape(num_blocks, window, *values.shape[1:]), 1, -1)
+
+    trend = np.arange(window) - (window - 1) / 2
+    centred = blocks - blocks.mean(axis=-1, keepdims=True)
+    spread = np.sqrt(np.sum(centred ** 2, axis=-1) * np.sum(trend ** 2))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = np.clip(centred @ trend / spread, -1, 1)
+    correlation[~np.isfinite(correlation)] = 0
+
+    return np.trunc(correlation * scale * multiplier).astype(np.int64)
+
+def correlation_offsets(profile, num_values, standard_deviation_range, rolling=False):
+    """
+    Maps a correlation profile back onto the values it was computed from, giving the offset added to each value.
+    Block profiles apply to every value of their block, rolling profiles to the value their block ends at.
+    Values that no complete block covers get no offset.
+    """
+    profile = np.asarray(profile, dtype=np.int64)
+    offsets = np.zeros((num_values,) + profile.shape[1:], dtype=np.int64)
+    window = standard_deviation_range
+
+    if rolling:
+        covered = min(len(profile), max(num_values - window + 1, 0))
+        offsets[window - 1:window - 1 + covered] = profile[:covered]
+    else:
+        covered = min(len(profile) * window, num_values)
+        offsets[:covered] = np.repeat(profile, window, axis=0)[:covered]
+
+    return offsets
+
+def spectral_entropy_profile(vals, standard_deviation_range):
+    """
+    Spectral entropy (bits) of the standard_deviation_range values ending at every row, from a Welch PSD with
+    segments of half the window. The first standard_deviation_range - 1 rows have no full window and are NaN.
+    The whole series takes one batched rFFT pass, see entropy_methods.spectral_entropy_rolling.
+    vals may be 2-D (rows, columns), giving one profile per column.
+    """
+    values = float_array(vals)
+    profile = np.full(values.shape, np.nan, dtype=values.dtype)
+    window = standard_deviation_range
+    if window < 2 or len(values) < window:
+        return profile
+
+    profile[window - 1:] = spectral_entropy_rolling(values, window)
+    return profile
+
+def rolling_mean_std(vals, standard_deviation_range):
+    """
+    Mean and population standard deviation of the previous standard_deviation_range values of every row from
+    standard_deviation_range onwards. Windows with fewer than two values default to a mean of 0 and a deviation of 1.
+    vals may be 2-D (rows, columns), every column being windowed down its rows.
+    """
+    values = float_array(vals)
+    num_rows = max(len(values) - standard_deviation_range, 0)
+    shape = (num_rows,) + values.shape[1:]
+    if standard_deviation_range < 2 or num_rows == 0:
+        return np.zeros(shape, dtype=values.dtype), np.ones(shape, dtype=values.dtype)
+
+    windows = sliding_window_view(values, standard_deviation_range, axis=0)[:num_rows]
+    return np.mean(windows, axis=-1), np.std(windows, axis=-1)
+
+def deviation_ranges(vals, standard_deviation_range, deviation_method="std", offsets=None):
+    """
+    Computes the lower (previous values) and upper (next values) deviation range for every row in one pass.
+
+    Both windows hold standard_deviation_range - 1 values and are strided views over a single array,
+    so no per-row copies are made, and each window is estimated once for both of the rows it bounds.
+    Rows that fall inside the first standard_deviation_range values are left at 0.
+    vals may be 2-D (rows, columns), all columns then being estimated together down their rows.
+    """
+    values = float_array(vals)
+    if offsets is not None:
+        values = np.add(values, offsets, dtype=values.dtype)
+
+    n = len(values)
+    window = standard_deviation_range
+    width = window - 1
+    lower_ranges = np.zeros(values.shape, dtype=values.dtype)
+    upper_ranges = np.zeros(values.shape, dtype=values.dtype)
+
+    if deviation_method not in WINDOW_ESTIMATORS:
+        print("[ X ] Invalid standard deviation method. Using fallback method.")
+        deviation_method = "std"
+
+    if n <= window or width < 2:
+        return lower_ranges, upper_ranges
+
+    estimator = WINDOW_ESTIMATORS[deviation_method]
+    windows = sliding_window_view(values, width, axis=0)  # windows[s] = values[s : s + width], moved to the last axis
+
+    # the previous values of row lc are the window starting at lc - window + 1 and its next values the window
+    # starting at lc + 1, so row lc's lower window is row lc - window's upper window. Every window from 1 up to
+    # the last full forward window is estimated exactly once and shared by both bounds.
+    last = n - window + 1 if n - window + 1 > window else n - window
+    with stage("estimator " + deviation_method):
+        if deviation_method in SERIES_ESTIMATORS:
+            estimates = SERIES_ESTIMATORS[deviation_method](values[1 : last + width], width)
+        else:
+            # estimates[s - 1] is the estimate of windows[s], made in blocks so the estimator's (rows, width)
+            # temporaries stay small whatever the length of the dataset
+            estimates = np.empty((last,) + values.shape[1:], dtype=values.dtype)
+            for start in range(0, last, ESTIMATOR_BLOCK_ROWS):
+                stop = min(start + ESTIMATOR_BLOCK_ROWS, last)
+                estimates[start:stop] = estimator(windows[1 + start : 1 + stop])
+
+    lower_ranges[window:] = estimates[: n - window]
+    if last > window:
+        upper_ranges[window : n - window + 1] = estimates[window : n - window + 1]
+
+    # the last rows only have a truncated forward window
+    scalar_estimator = SCALAR_ESTIMATORS[deviation_method]
+    with stage("estimator " + deviation_method + " (tail)"):
+        for lc in range(max(window, n - window + 1), n):
+            tail = values[lc + 1:]
+            if len(tail) > 1:
+                upper_ranges[lc] = scalar_estimator(tail) if tail.ndim == 1 else [scalar_estimator(column) for column in tail.T]
+
+    return lower_ranges, upper_ranges
@@ -0,0 +1,178 @@
+import os
+import numpy as np
+import pandas as pd
+from entropy_methods import QuantumEntropyPool
+from sliding_window import deviation_ranges, correlation_profile, correlation_offsets
+from pipeline import METHODS, available_methods, generate_from_ranges, generate_gaussian
+from entropy_sources import create_source
+from ingest import parse_column
+from instrumentation import stage
+
+
+class StreamProcessor:
+    """
+    Generates new values for a series that arrives in chunks, buffering only the values the windows still need.
+    Row i is finalised once the standard_deviation_range - 1 values after it have arrived, so no more than
+    3 * standard_deviation_range values are carried between chunks. As in load_csv, the first
+    standard_deviation_range rows are dropped.
+
+    correlation is an optional (scale, multiplier, rolling) tuple that applies the automatic correlation profile
+    to the windows. With block profiles a row also waits until the blocks its forward window touches are complete.
+    """
+
+    def __init__(self, method, standard_deviation_range=10, deviation_method="std", RANDOM_API_KEY=None, QUANTUM_API_KEY=None, seed=None, correlation=None, client=None):
+        if method not in available_methods():
+            raise ValueError(f"Invalid method: {method}. Options: {', '.join(available_methods())}")
+
+        self.method = method
+        self.window = standard_deviation_range
+        self.deviation_method = deviation_method
+        self.RANDOM_API_KEY = RANDOM_API_KEY
+        self.QUANTUM_API_KEY = QUANTUM_API_KEY
+        self.client = client
+        self.pool = QuantumEntropyPool(QUANTUM_API_KEY, client=client) if method == "Quantum" else None
+        self.rng = np.random.default_rng(seed)
+        self.source = None
+        if method not in METHODS:
+            # a registered source, kept for the whole stream so its draws continue from chunk to chunk
+            self.source = create_source(method, seed=seed, RANDOM_API_KEY=RANDOM_API_KEY, QUANTUM_API_KEY=QUANTUM_API_KEY, client=client)
+        self.correlation = correlation
+
+        self.buffer = np.empty(0)  # raw values, the first one being row buffer_start
+        self.buffer_start = 0
+        self.next_row = standard_deviation_range
+
+    def feed(self, values):
+        """
+        Adds the next chunk of values and returns (original, generated, difference) for every row it completes.
+        """
+        self.buffer = np.concatenate([self.buffer, np.asarray(values, dtype=np.float64)])
+        total = self.buffer_start + len(self.buffer)
+        ready = total
+        if self.correlation is not None and not self.correlation[2]:
+            # block offsets are only known once the whole block has arrived
+            ready = (total // self.window) * self.window
+        return self._emit(ready - (self.window - 1))
+
+    def finish(self):
+        """
+        Ends the stream, finalising the remaining rows with truncated forward windows.
+        """
+        return self._emit(self.buffer_start + len(self.buffer))
+
+    def get_state(self):
+        """
+        Everything needed to carry on with the stream later as a JSON-serializable dict: the buffered values (the
+        trailing windows and correlation blocks), the next row to finalise and the position of the local random
+        generators. Values fetched from remote APIs cannot be rewound, only the Quantum pool's unused bytes are kept.
+        """
+        state = {
+            "buffer": self.buffer.tolist(),
+            "buffer_start": self.buffer_start,
+            "next_row": self.next_row,
+            "rng": self.rng.bit_generator.state,
+        }
+        if self.source is not None and hasattr(self.source, "rng"):
+            state["source_rng"] = self.source.rng.bit_generator.state
+        if self.pool is not None:
+            state["pool_buffer"] = bytes(self.pool._buffer).hex()
+        return state
+
+    def set_state(self, state):
+        """
+        Restores a state from get_state() into a processor created with the same settings.
+        """
+        self.buffer = np.asarray(state["buffer"], dtype=np.float64)
+        self.buffer_start = state["buffer_start"]
+        self.next_row = state["next_row"]
+        self.rng.bit_generator.state = state["rng"]
+        if "source_rng" in state:
+            self.source.rng.bit_generator.state = state["source_rng"]
+        if "pool_buffer" in state:
+            self.pool._buffer = bytearray.fromhex(state["pool_buffer"])
+
+    def _offsets(self, segment_start, segment_length):
+        # correlation offsets of the segment, profiled from the block boundary (or rolling window) before it
+        w = self.window
+        scale, multiplier, rolling = self.correlation
+        if rolling:
+            base = max(segment_start - (w - 1), 0)
+        else:
+            base = (segment_start // w) * w
+
+        values = self.buffer[base - self.buffer_start:]
+        profile = correlation_profile(values, w, scale, multiplier, rolling)
+        offsets = correlation_offsets(profile, len(values), w, rolling)
+        return offsets[segment_start - base:segment_start - base + segment_length]
+
+    def _generate(self, segment, num_rows, offsets=None):
+        w = self.window
+
+        # the segment starts w rows before the first row being generated, which is what the blank rows expect
+        if self.method == "Gaussian":
+            return generate_gaussian(segment[:num_rows + w], w, self.rng)[w:], None
+
+        lower_ranges, upper_ranges = deviation_ranges(segment, w, self.deviation_method, offsets)
+        new_vals, new_vals2 = generate_from_ranges(
+            lower_ranges[:num_rows + w], upper_ranges[:num_rows + w], self.method, w,
+            self.RANDOM_API_KEY, self.QUANTUM_API_KEY, self.pool, self.client, self.source,
+        )
+        return new_vals[w:], None if new_vals2 is None else new_vals2[w:]
+
+    def _emit(self, end):
+        start = self.next_row
+        if end <= start:
+            return np.empty(0), np.empty(0), np.empty(0)
+
+        w = self.window
+        # rows start..end need the w values before them and the w - 1 values after them
+        segment = self.buffer[start - w - self.buffer_start : end + w - 1 - self.buffer_start]
+        original = segment[w:w + end - start]
+
+        offsets = None
+        if self.correlation is not None:
+            offsets = self._offsets(start - w, len(segment))
+
+        generated, generated2 = self._generate(segment, end - start, offsets)
+        difference = original - generated
+        if generated2 is not None:
+            difference = difference - generated2
+
+        # keep only the values that rows from end onwards (and their correlation blocks) still need
+        keep_from = max(end - 2 * w, self.buffer_start)
+        self.buffer = self.buffer[keep_from - self.buffer_start:]
+        self.buffer_start = keep_from
+        self.next_row = end
+
+        return original, generated, difference
+
+
+def _append_csv(values, file, header):
+    pd.DataFrame(values).to_csv(file, header=header, index=False)
+
+
+def stream_csv(dataset_file, column_name, processor, chunksize=100_000, nrows=None, output_dir="output"):
+    """
+    Streams one column of a CSV file through a StreamProcessor, reading chunksize rows at a time and appending
+    every finalised row to random_values.csv and comparisons.csv straight away. Returns the number of rows written.
+    """
+    if os.path.exists(output_dir) == False:
+        os.makedirs(output_dir)
+
+    def batches():
+        for chunk in pd.read_csv(dataset_file, usecols=[column_name], chunksize=chunksize, nrows=nrows):
+            yield processor.feed(parse_column(chunk[column_name], column_name))
+        yield processor.finish()
+
+    written = 0
+    with open(os.path.join(output_dir, "random_values.csv"), "w", newline="") as random_file, \
+            open(os.path.join(output_dir, "comparisons.csv"), "w", newline="") as comparison_file:
+        for original, generated, difference in batches():
+            if len(original) == 0:
+                continue
+            with stage("write csv"):
+                _append_csv(generated, random_file, header=written == 0)
+                _append_csv(difference, comparison_file, header=written == 0)
+            written += len(original)
+
+    return written
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import itertools
+from dataclasses import asdict
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from ingest import read_columns
+from pipeline import generate_values
+from dataset_compare import comparison_stats
+from config import read_config
+
+# every key a job spec may set, with its default
+DEFAULT_SPEC = {
+    "dataset": "2024-02-11__2024-04-08.csv",
+    "nrows": None,
+    "columns": ["time"],
+    "deviation_methods": ["std"],
+    "sources": ["Gaussian"],
+    "standard_deviation_range": 10,
+    "auto_correlation": False,
+    "correlation_scale": 100,
+    "correlation_multiplier": 2,
+    "auto_correlation_rolling": False,
+    "seed": None,
+    "workers": None,
+    "config_file": "config.txt",
+    "output": "output/sweep_results.csv",
+}
+
+_catalog = None  # read-only memory map of the catalog, one per worker process
+
+
+def load_spec(path):
+    """
+    Reads a JSON job spec, filling in the defaults for anything it leaves out.
+    """
+    with open(path, "r") as file:
+        spec = json.load(file)
+
+    unknown = set(spec) - set(DEFAULT_SPEC)
+    if unknown:
+        raise ValueError(f"Unknown job spec keys: {', '.join(sorted(unknown))}")
+    return dict(DEFAULT_SPEC, **spec)
+
+
+def expand_jobs(spec):
+    """
+    Expands the spec into one job per (column, deviation method, source) combination.
+    Gaussian noise does not use the deviation method, so it gets a single job per column.
+    """
+    jobs = []
+    for column_index, column_name in enumerate(spec["columns"]):
+        for source in spec["sources"]:
+            deviation_methods = [None] if source == "Gaussian" else spec["deviation_methods"]
+            for deviation_method in deviation_methods:
+                jobs.append({
+                    "column": column_name,
+                    "column_index": column_index,
+                    "deviation_method": deviation_method,
+                    "source": source,
+                })
+
+    for index, job in enumerate(jobs):
+        job["seed"] = None if spec["seed"] is None else spec["seed"] + index
+    return jobs
+
+
+def _init_worker(catalog_path):
+    global _catalog
+    _catalog = np.load(catalog_path, mmap_mode="r")
+
+
+def run_job(job, settings):
+    """
+    Generates and compares one column with one deviation method and source, returning a row of the results table
+    with the statistics of the ComparisonResult that compare_datasets would give for it.
+    """
+    start = time.perf_counter()
+    w = settings["standard_deviation_range"]
+    vals = np.asarray(_catalog[job["column_index"]])
+
+    correlation = None
+    if settings["auto_correlation"]:
+        correlation = (settings["correlation_scale"], settings["correlation_multiplier"], settings["auto_correlation_rolling"])
+
+    new_vals, _ = generate_values(
+        vals, job["source"], w, job["deviation_method"] or "std", correlation,
+        settings["RANDOM_API_KEY"], settings["QUANTUM_API_KEY"], job["seed"],
+    )
+
+    # the first x values cannot be compared, the rest are compared like main.report does (original vs generated)
+    comparison = comparison_stats(vals[w:], new_vals[w:])
+
+    return dict(
+        {key: job[key] for key in ("column", "deviation_method", "source", "seed")},
+        **asdict(comparison),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def run_sweep(spec):
+    """
+    Loads the catalog once, shares it with a pool of worker processes as a read-only memory-mapped array and runs
+    every job of the spec in parallel. The results table is written to spec["output"] and returned.
+    """
+    columns = spec["columns"]
+    print("[ ! ] Loading " + ", ".join(columns) + " from " + spec["dataset"] + "..")
+    catalog = read_columns(spec["dataset"], columns, spec["nrows"])
+
+    settings = {key: spec[key] for key in ("standard_deviation_range", "auto_correlation", "correlation_scale",
+                                           "correlation_multiplier", "auto_correlation_rolling")}
+    settings["RANDOM_API_KEY"] = None
+    settings["QUANTUM_API_KEY"] = None
+
+    jobs = expand_jobs(spec)
+    if any(job["source"] != "Gaussian" for job in jobs):
+        settings["RANDOM_API_KEY"] = read_config("RANDOM_API_KEY", spec["config_file"])
+        settings["QUANTUM_API_KEY"] = read_config("QUANTUM_API_KEY", spec["config_file"])
+
+    # one contiguous row per column, so each worker reads its column without striding
+    temp_dir = tempfile.mkdtemp(prefix="entropy_sweep_")
+    catalog_path = os.path.join(temp_dir, "catalog.npy")
+    np.save(catalog_path, np.ascontiguousarray(catalog.T))
+    del catalog
+
+    try:
+        print("[ ! ] Running " + str(len(jobs)) + " jobs..")
+        with ProcessPoolExecutor(max_workers=spec["workers"], initializer=_init_worker, initargs=(catalog_path,)) as executor:
+            rows = list(executor.map(run_job, jobs, itertools.repeat(settings)))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    results = pd.DataFrame(rows)
+
+    output_dir = os.path.dirname(spec["output"])
+    if output_dir and os.path.exists(output_dir) == False:
+        os.makedirs(output_dir)
+    results.to_csv(spec["output"], index=False)
+    print("[ ! ] Done. Results written to " + spec["output"] + ".")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every (column, deviation method, source) combination of a job spec in parallel.")
+    parser.add_argument("spec", help="path to a JSON job spec")
+    args = parser.parse_args()
+
+    print(run_sweep(load_spec(args.spec)).to_string(index=False))
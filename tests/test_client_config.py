@@ -0,0 +1,59 @@
+import os
+import socket
+import pytest
+import requests
+
+import entropy_methods
+from runner import RunConfig, client_for, run
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET = os.path.join(REPO_DIR, "2024-02-11__2024-04-08.csv")
+
+
+@pytest.fixture
+def refused_anu(monkeypatch):
+    # ANU pointed at a port that was free a moment ago, so connecting to it is refused
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    monkeypatch.setattr(entropy_methods, "ANU_URL", f"http://127.0.0.1:{port}/")
+    monkeypatch.setattr(entropy_methods, "ANU_RATE_LIMIT", 0)
+
+
+def quantum_config(tmp_path, **settings):
+    return RunConfig(dataset_file=DATASET, method="Quantum", only_use=50, QUANTUM_API_KEY="key",
+                     output_dir=str(tmp_path), **settings)
+
+
+def test_default_settings_use_the_shared_client():
+    assert client_for(RunConfig()) is None
+
+
+def test_retry_settings_reach_the_client():
+    client = client_for(RunConfig(retries=1, backoff=0.25, fallback=False))
+
+    retry = client.session.get_adapter("https://").max_retries
+    assert (retry.total, retry.backoff_factor, client.fallback) == (1, 0.25, False)
+    client.close()
+
+
+def test_run_without_fallback_raises(tmp_path, refused_anu):
+    with pytest.raises(requests.ConnectionError):
+        run(quantum_config(tmp_path, retries=0, fallback=False))
+
+
+def test_run_with_fallback_uses_local_noise(tmp_path, refused_anu):
+    result = run(quantum_config(tmp_path, retries=0))
+
+    assert result.rows == 40
+    assert result.client.stats["anu"]["failures"] == 1
+    assert result.client.stats["anu"]["fallbacks"] > 0
+    result.client.close()
+
+
+def test_cli_options():
+    from main import config_from_args, parse_args
+
+    config = config_from_args(parse_args(["--method", "gaussian", "--retries", "5", "--backoff", "2", "--no-fallback"]))
+
+    assert (config.retries, config.backoff, config.fallback) == (5, 2.0, False)
@@ -0,0 +1,87 @@
+import os
+import pytest
+
+import dataset_compare
+from dataset_compare import compare_datasets, comparison_stats
+from output_writer import write_results, wide_columns, run_metadata
+from runner import RunConfig, run
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET = os.path.join(REPO_DIR, "2024-02-11__2024-04-08.csv")
+WINDOW = 10
+
+
+def make_run(output_dir, seed=1):
+    config = RunConfig(dataset_file=DATASET, column_name="time", method="pcg64", standard_deviation_range=WINDOW,
+                       seed=seed, only_use=300, output_dir=str(output_dir))
+    return run(config)
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    # no output/ folder of another run in the working directory, and the original dataset found from anywhere
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(dataset_compare, "ORIGINAL_DATASET", DATASET)
+
+
+def test_csv_results_in_another_output_dir(tmp_path):
+    output_dir = tmp_path / "o3"
+    result = make_run(output_dir)
+    write_results(result, str(output_dir), ("csv",))
+
+    comparison = compare_datasets(plots=False, output_dir=str(output_dir), original_offset=WINDOW)
+
+    assert comparison == comparison_stats(result.original, result.generated)
+
+
+def test_binary_results_match_the_csv_results(tmp_path):
+    output_dir = tmp_path / "o4"
+    result = make_run(output_dir)
+    write_results(result, str(output_dir), ("csv", "npy"))
+
+    from_binary = compare_datasets(plots=False, output_dir=str(output_dir))
+    os.remove(output_dir / "metadata.json")
+    from_csv = compare_datasets(plots=False, output_dir=str(output_dir), original_offset=WINDOW)
+
+    assert from_binary == from_csv
+
+
+def test_stale_binary_results_are_ignored(tmp_path):
+    output_dir = tmp_path / "o5"
+    write_results(make_run(output_dir, seed=1), str(output_dir), ("npy",))
+    result = make_run(output_dir, seed=2)
+    write_results(result, str(output_dir), ("csv",))
+    metadata_path = output_dir / "metadata.json"
+    os.utime(metadata_path, (os.path.getmtime(metadata_path) - 10,) * 2)
+
+    comparison = compare_datasets(plots=False, output_dir=str(output_dir), original_offset=WINDOW)
+
+    assert comparison == comparison_stats(result.original, result.generated)
+
+
+def make_wide_run(output_dir):
+    config = RunConfig(dataset_file=DATASET, column_names=["time", "latitude", "mag"], method="pcg64",
+                       standard_deviation_range=WINDOW, seed=1, only_use=300, output_dir=str(output_dir))
+    return run(config)
+
+
+def expected_columns(result):
+    return {name: comparison_stats(result.original[:, index], result.generated[:, index])
+            for index, name in enumerate(result.config.column_names)}
+
+
+@pytest.mark.parametrize("output_format", ["csv", "npy"])
+def test_multi_column_results_are_compared_per_column(tmp_path, output_format):
+    output_dir = tmp_path / output_format
+    result = make_wide_run(output_dir)
+    write_results(result, str(output_dir), (output_format,))
+
+    assert compare_datasets(plots=False, output_dir=str(output_dir)) == expected_columns(result)
+
+
+def test_wide_parquet_results_are_compared_per_column(tmp_path, monkeypatch):
+    # the columns a multi-column Parquet file reads back as, without needing pyarrow
+    result = make_wide_run(tmp_path)
+    monkeypatch.setattr(dataset_compare, "read_results", lambda output_dir: (wide_columns(result), run_metadata(result)))
+
+    assert compare_datasets(plots=False, output_dir=str(tmp_path)) == expected_columns(result)
@@ -0,0 +1,28 @@
+import os
+import numpy as np
+import pytest
+
+from entropy_sources import FileSource, HWRNG_PATH, available_sources
+
+
+def test_missing_device_is_named(tmp_path):
+    missing = str(tmp_path / "hwrng")
+
+    with pytest.raises(ValueError, match=missing):
+        FileSource(missing)
+
+
+def test_reads_uniform_values_from_a_file(tmp_path):
+    path = tmp_path / "random.bin"
+    path.write_bytes(os.urandom(8 * 100))
+    source = FileSource(str(path))
+
+    values = source.fill(100)
+    source.close()
+
+    assert len(values) == 100
+    assert np.all((values >= 0) & (values < 1))
+
+
+def test_hwrng_is_only_offered_when_readable():
+    assert ("hwrng" in available_sources("uniform")) == os.access(HWRNG_PATH, os.R_OK)
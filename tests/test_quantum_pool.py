@@ -0,0 +1,177 @@
+import json
+import socket
+import threading
+import time
+import numpy as np
+import pytest
+import requests
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import entropy_methods
+from entropy_client import EntropyClient
+from entropy_methods import QuantumEntropyPool, fetch_quantum_entropy_batch, ANU_MAX_LENGTH, ANU_SAMPLE_BYTES
+
+
+def expected_samples(data_type, block_size, count):
+    # the samples the stub serves, in order: 0, 1, 2, ... wrapped to the sample width
+    width = 8 * ANU_SAMPLE_BYTES[data_type]
+    per_request = ANU_MAX_LENGTH * (block_size if data_type.startswith("hex") else 1)
+    return np.arange(count, dtype=np.int64) % per_request % 2 ** width
+
+
+class _AnuHandler(BaseHTTPRequestHandler):
+    """
+    Answers ANU GET requests with the counting samples of expected_samples, encoded the way the API encodes them.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        length, data_type, size = int(query["length"][0]), query["type"][0], int(query["size"][0])
+        sample_bytes = ANU_SAMPLE_BYTES[data_type]
+        if data_type.startswith("hex"):
+            samples = expected_samples(data_type, size, length * size)
+            raw = samples.astype(">u" + str(sample_bytes)).tobytes()
+            element = size * sample_bytes
+            data = [raw[i:i + element].hex() for i in range(0, len(raw), element)]
+        else:
+            data = expected_samples(data_type, 1, length).tolist()
+
+        with self.server.lock:
+            self.server.requests += 1
+        payload = json.dumps({"success": True, "type": data_type, "length": length, "data": data}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def anu_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _AnuHandler)
+    server.daemon_threads = True
+    server.requests = 0
+    server.lock = threading.Lock()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    monkeypatch.setattr(entropy_methods, "ANU_RATE_LIMIT", 0)
+
+
+@pytest.fixture
+def client():
+    client = EntropyClient(retries=0, fallback=False)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def refused_url():
+    # a port that was free a moment ago, so connecting to it is refused
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/"
+
+
+@pytest.mark.parametrize("data_type", ["uint8", "uint16", "hex8", "hex16"])
+def test_decodes_samples(anu_server, client, data_type):
+    pool = QuantumEntropyPool("key", data_type=data_type, block_size=3, low_water=0, url=anu_server.url, client=client)
+    count = pool.request_bytes // pool.sample_bytes + 5  # runs into a second request
+
+    samples = np.concatenate([pool.take(count - 5), pool.take(5)])
+
+    np.testing.assert_array_equal(samples, expected_samples(data_type, 3, count))
+    assert pool.requests_made == 2
+
+
+@pytest.mark.parametrize("data_type", ["uint8", "hex16"])
+def test_uniform_is_scaled_onto_unit_range(anu_server, client, data_type):
+    pool = QuantumEntropyPool("key", data_type=data_type, url=anu_server.url, client=client)
+    values = pool.uniform(1000)
+
+    assert values.min() >= 0 and values.max() <= 1
+    np.testing.assert_allclose(values, expected_samples(data_type, pool.block_size, 1000) / pool.max_level)
+
+
+def test_background_refill(anu_server, client):
+    pool = QuantumEntropyPool("key", data_type="uint8", url=anu_server.url, client=client)
+
+    taken = ANU_MAX_LENGTH - pool.low_water + 1  # leaves the buffer just below low_water
+    pool.take(taken)
+    pool._refill_thread.join(timeout=10)
+
+    assert pool.requests_made == 2
+    assert anu_server.requests == 2
+    assert pool.available() == 2 * ANU_MAX_LENGTH - taken
+
+    # the refilled block follows on from the rest of the first one
+    samples = pool.take(ANU_MAX_LENGTH)
+    np.testing.assert_array_equal(samples, expected_samples("uint8", 1, 2 * ANU_MAX_LENGTH)[taken:taken + ANU_MAX_LENGTH])
+
+
+def test_concurrent_takes_share_the_buffer(anu_server, client):
+    pool = QuantumEntropyPool("key", data_type="uint16", url=anu_server.url, client=client)
+    results = []
+
+    def take():
+        results.append(pool.take(100))
+
+    threads = [threading.Thread(target=take) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # every sample is served exactly once
+    np.testing.assert_array_equal(np.sort(np.concatenate(results)), expected_samples("uint16", 1, 800))
+
+
+def test_rate_limit_spaces_out_requests(anu_server, client):
+    pool = QuantumEntropyPool("key", data_type="uint8", low_water=0, url=anu_server.url, client=client, rate=20)
+    results = []
+
+    def take():
+        results.append(pool.take(ANU_MAX_LENGTH))
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=take) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # three requests from three threads, each one starting at least 1 / 20 s after the previous one
+    assert pool.requests_made == 3
+    assert time.monotonic() - start >= 2 / 20
+
+
+def test_falls_back_when_connection_is_refused(refused_url):
+    client = EntropyClient(retries=0, fallback=True)
+    pool = QuantumEntropyPool("key", url=refused_url, client=client)
+    min_vals = np.array([1.0, 2.0, 3.0])
+    max_vals = np.array([2.0, 4.0, 6.0])
+
+    noise = fetch_quantum_entropy_batch(min_vals, max_vals, "key", pool=pool)
+
+    assert len(noise) == 3
+    assert client.stats["anu"]["failures"] == 1
+    assert client.stats["anu"]["fallbacks"] == 3
+    client.close()
+
+
+def test_raises_when_connection_is_refused_without_fallback(refused_url, client):
+    pool = QuantumEntropyPool("key", url=refused_url, client=client)
+
+    with pytest.raises(requests.ConnectionError):
+        fetch_quantum_entropy_batch(np.array([1.0]), np.array([2.0]), "key", pool=pool)
@@ -0,0 +1,24 @@
+import os
+from dataclasses import asdict
+
+import sweep
+from dataset_compare import comparison_stats
+from ingest import read_column
+from pipeline import generate_values
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATASET = os.path.join(REPO_DIR, "2024-02-11__2024-04-08.csv")
+
+
+def test_rows_hold_the_comparison_statistics(tmp_path):
+    spec = dict(sweep.DEFAULT_SPEC, dataset=DATASET, nrows=500, columns=["mag"], sources=["Gaussian", "pcg64"],
+                seed=7, workers=1, output=str(tmp_path / "sweep.csv"))
+
+    results = sweep.run_sweep(spec)
+
+    vals = read_column(DATASET, "mag", 500)
+    w = spec["standard_deviation_range"]
+    for job, row in zip(sweep.expand_jobs(spec), results.to_dict("records")):
+        new_vals, _ = generate_values(vals, job["source"], w, job["deviation_method"] or "std", None, seed=job["seed"])
+        for name, value in asdict(comparison_stats(vals[w:], new_vals[w:])).items():
+            assert row[name] == value, name